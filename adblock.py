@@ -0,0 +1,321 @@
+# adblock.py
+import glob
+import marshal
+import os
+import re
+import threading
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+
+CACHE_VERSION = 1
+TOKEN_RE = re.compile(r"[a-z0-9%]+")
+
+# EasyList $type options we understand; a rule with any other option is skipped
+RESOURCE_TYPES = {
+    "script", "image", "stylesheet", "xmlhttprequest", "subdocument", "media",
+    "font", "object", "ping", "other",
+}
+
+_INFO = QWebEngineUrlRequestInfo
+QT_RESOURCE_TYPES = {
+    _INFO.ResourceTypeScript: "script",
+    _INFO.ResourceTypeImage: "image",
+    _INFO.ResourceTypeFavicon: "image",
+    _INFO.ResourceTypeStylesheet: "stylesheet",
+    _INFO.ResourceTypeXhr: "xmlhttprequest",
+    _INFO.ResourceTypeSubFrame: "subdocument",
+    _INFO.ResourceTypeMedia: "media",
+    _INFO.ResourceTypeFontResource: "font",
+    _INFO.ResourceTypeObject: "object",
+    _INFO.ResourceTypePing: "ping",
+}
+
+
+def _registrable(host):
+    # Good enough for first/third-party checks without shipping the public suffix list
+    return ".".join(host.rsplit(".", 2)[-2:])
+
+
+def _host_suffixes(host):
+    """'a.b.example.com' → 'a.b.example.com', 'b.example.com', 'example.com', 'com'."""
+    while host:
+        yield host
+        dot = host.find(".")
+        if dot == -1:
+            return
+        host = host[dot + 1:]
+
+
+def _pattern_to_regex(pattern):
+    out = []
+    if pattern.startswith("||"):
+        out.append(r"^[a-z][a-z0-9+.-]*:/+(?:[^/?#]*\.)?")
+        pattern = pattern[2:]
+    elif pattern.startswith("|"):
+        out.append("^")
+        pattern = pattern[1:]
+    end_anchor = pattern.endswith("|")
+    if end_anchor:
+        pattern = pattern[:-1]
+    for ch in pattern:
+        if ch == "*":
+            out.append(".*")
+        elif ch == "^":
+            out.append(r"(?:[^a-z0-9_.%-]|$)")
+        else:
+            out.append(re.escape(ch))
+    if end_anchor:
+        out.append("$")
+    return "".join(out)
+
+
+def _best_token(pattern):
+    """
+    The longest literal run of token characters that is bounded on both sides
+    inside the pattern, so it must appear as a whole token in any matching URL.
+    Returns None if the pattern has no such run.
+    """
+    body = pattern.lstrip("|")
+    anchored_start = pattern.startswith("|")
+    best = None
+    for m in TOKEN_RE.finditer(body):
+        start, end = m.span()
+        before = body[start - 1] if start else None
+        after = body[end] if end < len(body) else None
+        left_ok = (before is None and anchored_start) or (before is not None and before != "*")
+        right_ok = after is not None and after not in "*|"
+        if left_ok and right_ok and (best is None or end - start > len(best)):
+            best = m.group()
+    return best
+
+
+class RuleSet:
+    """
+    Generic URL rules with a token index: each rule is filed under one token it
+    is guaranteed to contain, so a URL only tests rules whose token it has.
+    Regexes are compiled the first time a rule becomes a candidate.
+    """
+    def __init__(self, rules=(), index=None, untokenized=None):
+        self.rules = list(rules)   # (regex, types, third_party, include, exclude)
+        self.index = index if index is not None else {}
+        self.untokenized = untokenized if untokenized is not None else []
+        self._compiled = {}
+
+    def add(self, regex, token, types, third_party, include, exclude):
+        self.rules.append((regex, types, third_party, include, exclude))
+        if token:
+            self.index.setdefault(token, []).append(len(self.rules) - 1)
+        else:
+            self.untokenized.append(len(self.rules) - 1)
+
+    def match(self, url, tokens, resource_type, third_party, first_party_host):
+        for token in tokens:
+            for i in self.index.get(token, ()):
+                if self._test(i, url, resource_type, third_party, first_party_host):
+                    return True
+        for i in self.untokenized:
+            if self._test(i, url, resource_type, third_party, first_party_host):
+                return True
+        return False
+
+    def _test(self, i, url, resource_type, third_party, first_party_host):
+        regex, types, rule_third_party, include, exclude = self.rules[i]
+        if types is not None and resource_type not in types:
+            return False
+        if rule_third_party is not None and rule_third_party != third_party:
+            return False
+        if include or exclude:
+            suffixes = set(_host_suffixes(first_party_host))
+            if include and suffixes.isdisjoint(include):
+                return False
+            if exclude and not suffixes.isdisjoint(exclude):
+                return False
+        compiled = self._compiled.get(i)
+        if compiled is None:
+            compiled = self._compiled[i] = re.compile(regex)
+        return compiled.search(url) is not None
+
+    def dump(self):
+        return (self.rules, self.index, self.untokenized)
+
+
+class FilterEngine:
+    """
+    Compiled EasyList-style filters. Plain `||host^` rules go into a hashed
+    domain set checked by host suffix; everything else goes into token-indexed
+    RuleSets. Exception (@@) rules are kept apart and only consulted on a hit.
+    """
+    def __init__(self):
+        self.block_domains = set()
+        self.allow_domains = set()
+        self.block_rules = RuleSet()
+        self.allow_rules = RuleSet()
+        self.skipped = 0
+
+    # ---------- Compiling ----------
+    @classmethod
+    def from_lines(cls, lines):
+        engine = cls()
+        for line in lines:
+            engine.add_rule(line)
+        return engine
+
+    def add_rule(self, line):
+        line = line.strip()
+        if not line or line.startswith(("!", "[")) or "##" in line or "#@#" in line or "#?#" in line:
+            return
+        allow = line.startswith("@@")
+        if allow:
+            line = line[2:]
+
+        pattern, _, options = line.partition("$")
+        types, third_party, include, exclude = None, None, (), ()
+        if options:
+            parsed = self._parse_options(options)
+            if parsed is None:
+                self.skipped += 1
+                return
+            types, third_party, include, exclude = parsed
+        pattern = pattern.lower()
+        if not pattern or (pattern.startswith("/") and pattern.endswith("/") and len(pattern) > 1):
+            self.skipped += 1  # raw regex filters are too slow for the request hot path
+            return
+
+        host = pattern[2:].rstrip("^") if pattern.startswith("||") else None
+        if host and not options and re.fullmatch(r"[a-z0-9.-]+", host):
+            (self.allow_domains if allow else self.block_domains).add(host)
+            return
+
+        rules = self.allow_rules if allow else self.block_rules
+        rules.add(_pattern_to_regex(pattern), _best_token(pattern), types, third_party, include, exclude)
+
+    def _parse_options(self, options):
+        include_types, exclude_types = set(), set()
+        third_party, include, exclude = None, [], []
+        for option in options.lower().split(","):
+            negated = option.startswith("~")
+            name = option.lstrip("~")
+            if name == "third-party":
+                third_party = not negated
+            elif name in RESOURCE_TYPES:
+                (exclude_types if negated else include_types).add(name)
+            elif name.startswith("domain="):
+                for domain in name[len("domain="):].split("|"):
+                    if domain.startswith("~"):
+                        exclude.append(domain[1:])
+                    elif domain:
+                        include.append(domain)
+            else:
+                return None  # popup, csp=, redirect=, match-case, ... are out of scope for a request filter
+        types = None
+        if include_types or exclude_types:
+            types = tuple(sorted(include_types or (RESOURCE_TYPES - exclude_types)))
+        return types, third_party, tuple(include), tuple(exclude)
+
+    # ---------- Matching ----------
+    def match(self, url, first_party_host="", resource_type="other"):
+        """True if a request for url (made from a page on first_party_host) should be blocked."""
+        url = url.lower()
+        host = url.split("://", 1)[-1].split("/", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+        third_party = bool(first_party_host) and _registrable(host) != _registrable(first_party_host)
+
+        blocked = any(h in self.block_domains for h in _host_suffixes(host))
+        tokens = None
+        if not blocked:
+            tokens = set(TOKEN_RE.findall(url))
+            blocked = self.block_rules.match(url, tokens, resource_type, third_party, first_party_host)
+        if not blocked:
+            return False
+
+        if any(h in self.allow_domains for h in _host_suffixes(host)):
+            return False
+        if tokens is None:
+            tokens = set(TOKEN_RE.findall(url))
+        return not self.allow_rules.match(url, tokens, resource_type, third_party, first_party_host)
+
+    # ---------- Binary cache ----------
+    def save(self, path, fingerprint):
+        data = (CACHE_VERSION, fingerprint, frozenset(self.block_domains), frozenset(self.allow_domains),
+                self.block_rules.dump(), self.allow_rules.dump(), self.skipped)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, fingerprint):
+        """The cached engine, or None if the cache is missing, stale or from another version."""
+        try:
+            with open(path, "rb") as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(data, tuple) or len(data) != 7 or data[0] != CACHE_VERSION or data[1] != fingerprint:
+            return None
+        engine = cls()
+        engine.block_domains = set(data[2])
+        engine.allow_domains = set(data[3])
+        engine.block_rules = RuleSet(*data[4])
+        engine.allow_rules = RuleSet(*data[5])
+        engine.skipped = data[6]
+        return engine
+
+
+def list_fingerprint(paths):
+    """Identifies a set of filter list files by name, size and mtime."""
+    result = []
+    for path in sorted(paths):
+        st = os.stat(path)
+        result.append((os.path.basename(path), st.st_size, st.st_mtime_ns))
+    return tuple(result)
+
+
+def load_filter_engine(directory, cache_path):
+    """Loads the compiled lists from cache_path, recompiling *.txt in directory if they changed."""
+    paths = glob.glob(os.path.join(directory, "*.txt"))
+    fingerprint = list_fingerprint(paths)
+    engine = FilterEngine.load(cache_path, fingerprint)
+    if engine is not None:
+        return engine
+
+    engine = FilterEngine()
+    for path in sorted(paths):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                engine.add_rule(line)
+    try:
+        engine.save(cache_path, fingerprint)
+    except OSError as e:
+        print("Could not cache compiled filters:", e)
+    return engine
+
+
+class AdBlockInterceptor(QWebEngineUrlRequestInterceptor):
+    """
+    Blocks subresource requests matched by the filter engine. The engine is
+    compiled (or read from cache) on a background thread; until it is ready,
+    requests pass through untouched.
+    """
+    def __init__(self, filters_dir, cache_path, parent=None):
+        super().__init__(parent)
+        self.engine = None
+        self.enabled = True
+        self.blocked = 0
+        self.checked = 0
+        os.makedirs(filters_dir, exist_ok=True)
+        threading.Thread(target=self._load, args=(filters_dir, cache_path),
+                         name="adblock-loader", daemon=True).start()
+
+    def _load(self, filters_dir, cache_path):
+        self.engine = load_filter_engine(filters_dir, cache_path)
+
+    def interceptRequest(self, info):
+        engine = self.engine
+        if engine is None or not self.enabled:
+            return
+        if info.resourceType() == QWebEngineUrlRequestInfo.ResourceTypeMainFrame:
+            return  # never block a page the user navigated to
+        self.checked += 1
+        resource_type = QT_RESOURCE_TYPES.get(info.resourceType(), "other")
+        if engine.match(info.requestUrl().toString(), info.firstPartyUrl().host(), resource_type):
+            self.blocked += 1
+            info.block(True)
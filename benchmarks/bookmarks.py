@@ -0,0 +1,74 @@
+# benchmarks/bookmarks.py
+"""
+Import, index build and search latency of BookmarkStore with a large
+collection, generated as a Netscape bookmarks.html and imported the same way
+a user's file would be.
+
+    python -m benchmarks.bookmarks --bookmarks 50000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bookmarks import BookmarkStore
+
+WORDS = ("python", "news", "recipe", "travel", "music", "docs", "linux", "video",
+         "shop", "blog", "research", "paper", "weather", "maps", "games", "finance")
+QUERIES = ("pyth", "news", "python news", "site42", "rec trav", "music page", "zzz", "p")
+
+
+def write_bookmarks_file(path, count, folders, rng):
+    per_folder = max(1, count // folders)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<DL><p>\n")
+        for folder in range(folders):
+            f.write(f"<DT><H3>Folder {folder}</H3>\n<DL><p>\n")
+            for i in range(per_folder):
+                a, b, c = rng.sample(WORDS, 3)
+                f.write(f'<DT><A HREF="https://site{i}.{a}.example/p/{folder}" ADD_DATE="1600000000" '
+                        f'TAGS="{b},{c}">{a.title()} {b} page {i}</A>\n')
+            f.write("</DL><p>\n")
+        f.write("</DL><p>\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookmarks", type=int, default=50_000)
+    parser.add_argument("--folders", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "bookmarks.html")
+        write_bookmarks_file(source, args.bookmarks, args.folders, random.Random(1))
+        store = BookmarkStore(os.path.join(tmp, "bookmarks.sqlite"))
+
+        start = time.perf_counter()
+        added = store.import_html(source)
+        print(f"import:       {added:,} bookmarks in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        store.children()
+        print(f"root folder:  {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        store.index
+        print(f"index build:  {(time.perf_counter() - start) * 1000:.0f} ms (once, on first search)")
+
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = store.search(query)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"search {query!r:<14}{elapsed * 1000:>8.3f} ms  ({len(results)} results)")
+
+        start = time.perf_counter()
+        store.export_html(os.path.join(tmp, "export.html"))
+        print(f"export:       {time.perf_counter() - start:.2f} s")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/history.py
+"""
+Insert and lookup throughput of HistoryStore at scale.
+
+    python -m benchmarks.history --entries 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from history import HistoryStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite"), max_age_days=0, max_urls=0)
+        now = time.time()
+        urls = [f"https://site{i % 5000}.example/page/{i}" for i in range(args.entries)]
+
+        start = time.perf_counter()
+        for i, url in enumerate(urls):
+            store.record_visit(url, when=now - i)
+        queued = time.perf_counter() - start
+        store.flush()
+        inserted = time.perf_counter() - start
+        print(f"record_visit (caller side): {args.entries / queued:,.0f} visits/s")
+        print(f"insert (committed):         {args.entries / inserted:,.0f} visits/s "
+              f"({inserted:.1f} s for {args.entries:,})")
+
+        probes = random.sample(urls, min(args.lookups, len(urls)))
+        probes += [url + "-missing" for url in probes[: len(probes) // 10]]
+        start = time.perf_counter()
+        hits = sum(1 for url in probes if url in store)
+        elapsed = time.perf_counter() - start
+        print(f"lookup:                     {len(probes) / elapsed:,.0f} lookups/s "
+              f"({hits:,} hits of {len(probes):,})")
+
+        start = time.perf_counter()
+        store.recent(100)
+        print(f"recent(100):                {(time.perf_counter() - start) * 1000:.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/page_text.py
+"""
+Indexing throughput and search latency of PageTextIndex over a large set of
+synthetic pages (Zipf-distributed vocabulary, a share of duplicate texts
+under different URLs).
+
+    python -m benchmarks.page_text --pages 30000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from pagetext import PageTextIndex
+
+VOCABULARY = 20000
+QUERIES = 200
+
+
+def make_words(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(VOCABULARY)]
+
+
+def make_page(rng, words, weights, length):
+    return " ".join(rng.choices(words, weights, k=length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=30_000)
+    parser.add_argument("--words-per-page", type=int, default=800)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of pages repeating an earlier text")
+    parser.add_argument("--max-mb", type=float, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    words = make_words(rng)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = PageTextIndex(os.path.join(tmp, "page_text.sqlite"), max_bytes=int(args.max_mb * 1024 * 1024))
+        texts = []
+        start = time.perf_counter()
+        handoff = 0.0
+        for i in range(args.pages):
+            if texts and rng.random() < args.duplicates:
+                text = rng.choice(texts)
+            else:
+                text = make_page(rng, words, weights, args.words_per_page)
+                if len(texts) < 1000:
+                    texts.append(text)
+            t = time.perf_counter()
+            index.add_page(f"https://site{i % 3000}.example/article/{i}", f"Article {i} {words[i % 500]}", text)
+            handoff += time.perf_counter() - t
+        index.flush()
+        elapsed = time.perf_counter() - start
+        print(f"FTS{index.fts_version}: {len(index):,} pages, {index.size() / 1024 / 1024:,.0f} MiB of text, "
+              f"database {os.path.getsize(index.path) / 1024 / 1024:,.0f} MiB")
+        print(f"indexing:        {args.pages / elapsed:,.0f} pages/s (including page generation)")
+        print(f"UI-thread cost:  {handoff / args.pages * 1e6:.1f} µs per add_page")
+
+        for label, pick in (("common word", lambda: words[rng.randrange(50)]),
+                            ("rare word", lambda: words[rng.randrange(5000, VOCABULARY)]),
+                            ("two words", lambda: f"{words[rng.randrange(200)]} {words[rng.randrange(200, 3000)]}"),
+                            ("prefix", lambda: words[rng.randrange(1000)][:4])):
+            latencies = []
+            for _ in range(QUERIES):
+                query = pick()
+                t = time.perf_counter()
+                index.search(query)
+                latencies.append((time.perf_counter() - t) * 1000)
+            latencies.sort()
+            print(f"search {label:<12} p50 {statistics.median(latencies):7.2f} ms   "
+                  f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
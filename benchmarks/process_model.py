@@ -0,0 +1,146 @@
+# benchmarks/process_model.py
+"""
+Renderer memory and tab-switch latency under each process model. Every mode
+runs in its own browser process (Chromium reads its switches once) against
+the same local pages, spread over several sites: stand-in servers on
+127.0.0.1, 127.0.0.2, ... which Chromium treats as different sites (binding
+those addresses works on Linux; elsewhere use --sites 1).
+
+Tab switch latency is the time from selecting a tab until its page runs a
+requestAnimationFrame callback, i.e. until its renderer is producing frames.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.process_model --tabs 12 --limit 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.server import StandInServer
+
+
+def wait_until(predicate, timeout_ms=30000):
+    from PyQt5.QtTest import QTest
+    deadline = time.perf_counter() + timeout_ms / 1000
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step timed out")
+        QTest.qWait(1)
+
+
+def modes(limit):
+    from storage import process_model_flags
+    return {
+        "default": process_model_flags("default", 0),
+        "process-per-site": process_model_flags("process-per-site", 0),
+        "process-per-site-instance": process_model_flags("process-per-site-instance", 0),
+        f"limit-{limit}": process_model_flags("default", limit),
+    }
+
+
+def worker(mode, sites, tabs, switches):
+    from PyQt5.QtTest import QTest
+    from PyQt5.QtWidgets import QApplication
+    from metrics import process_rss_kb
+    from ui import Browser
+
+    app = QApplication(sys.argv[:1])
+    browser = Browser()
+    browser.show()
+    loaded = []
+    browser.first_page_loaded.connect(lambda: loaded.append(True))
+    wait_until(lambda: loaded)
+
+    finished = set()
+    for i in range(tabs):
+        tab = browser.add_tab(f"{sites[i % len(sites)]}/pages/tab-{i}", f"Tab {i}")
+        browser.web_view(tab).loadFinished.connect(lambda ok, t=tab: finished.add(t))
+    wait_until(lambda: len(finished) >= tabs, timeout_ms=120000)
+    QTest.qWait(1000)  # let renderers settle before measuring memory
+
+    renderers = browser.renderer_report()
+    renderer_kb = sum(row["rss_kb"] or 0 for row in renderers)
+    browser_kb = process_rss_kb(os.getpid()) or 0
+
+    latencies = []
+    count = browser.tabs.count()
+    for n in range(switches):
+        index = (browser.tabs.currentIndex() + 1 + n % (count - 1)) % count  # always a different tab
+        web_view = browser.web_view(browser.tabs.widget(index))
+        mark = f"frame-{n}"
+        seen = []
+        on_title = lambda title: title == mark and seen.append(True)
+        web_view.titleChanged.connect(on_title)
+        start = time.perf_counter()
+        browser.tabs.setCurrentIndex(index)
+        web_view.page().runJavaScript(f"requestAnimationFrame(function() {{ document.title = '{mark}'; }});")
+        wait_until(lambda: seen, timeout_ms=10000)
+        latencies.append((time.perf_counter() - start) * 1000)
+        web_view.titleChanged.disconnect(on_title)
+
+    latencies.sort()
+    result = {
+        "mode": mode,
+        "flags": os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", ""),
+        "tabs": browser.tabs.count(),
+        "renderer_processes": len(renderers),
+        "renderer_rss_mb": round(renderer_kb / 1024, 1),
+        "total_rss_mb": round((renderer_kb + browser_kb) / 1024, 1),
+        "renderers": renderers,
+        "switch_p50_ms": round(statistics.median(latencies), 2),
+        "switch_p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+    }
+    print(json.dumps(result))
+    browser.close()
+    app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=12)
+    parser.add_argument("--sites", type=int, default=4, help="distinct sites the tabs are spread over")
+    parser.add_argument("--limit", type=int, default=2, help="renderer cap for the limit-N mode")
+    parser.add_argument("--switches", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--site-urls", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.site_urls, args.tabs, args.switches)
+        return
+
+    servers = [StandInServer(host=f"127.0.0.{i + 1}").start() for i in range(args.sites)]
+    results = []
+    try:
+        for mode, flags in modes(args.limit).items():
+            with tempfile.TemporaryDirectory() as profile:
+                with open(os.path.join(profile, "settings.ini"), "w", encoding="utf-8") as f:
+                    f.write(f"[General]\nhome_url={servers[0].page_url('home')}\n")
+                env = dict(os.environ, COBALT_DATA_DIR=profile, QTWEBENGINE_CHROMIUM_FLAGS=" ".join(
+                    filter(None, [os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "")] + flags)))
+                env.setdefault("QT_QPA_PLATFORM", "offscreen")
+                out = subprocess.run([sys.executable, "-m", "benchmarks.process_model", "--worker", mode,
+                                      "--tabs", str(args.tabs), "--switches", str(args.switches),
+                                      "--site-urls"] + [s.url("") for s in servers],
+                                     env=env, check=True, capture_output=True, text=True, timeout=600).stdout
+                results.append(json.loads(out.strip().splitlines()[-1]))
+    finally:
+        for server in servers:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mode':<28}{'renderers':>10}{'renderer MB':>13}{'total MB':>10}{'switch p50':>12}{'p95':>8}")
+        for r in results:
+            print(f"{r['mode']:<28}{r['renderer_processes']:>10}{r['renderer_rss_mb']:>13.1f}"
+                  f"{r['total_rss_mb']:>10.1f}{r['switch_p50_ms']:>12.2f}{r['switch_p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
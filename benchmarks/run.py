@@ -0,0 +1,297 @@
+# benchmarks/run.py
+"""
+Headless benchmark suite. Drives Browser and Shortcuts under the offscreen
+platform against the local stand-in server (synthetic pages, suggestion JSON,
+an update feed and a download) and writes the results as JSON.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.run --output results.json
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.run --compare baseline.json --threshold 0.15
+
+With --compare, exits non-zero if any metric is worse than the baseline by
+more than the threshold (a fraction of the baseline value).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QEvent, QUrl, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.server import StandInServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+
+
+def make_profile(directory, server):
+    """A throwaway data directory whose settings point the browser at the stand-in server."""
+    with open(os.path.join(directory, "settings.ini"), "w", encoding="utf-8") as f:
+        f.write("[General]\n"
+                f"home_url={server.page_url('home')}\n"
+                f"suggest_url={server.suggest_url()}\n")
+    return directory
+
+
+def wait_until(predicate, timeout_ms=30000):
+    deadline = time.perf_counter() + timeout_ms / 1000
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step timed out")
+        QTest.qWait(1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better="lower"):
+        self.metrics[name] = {"value": round(value, 2), "unit": unit, "better": better}
+        print(f"{name:<28}{value:>12.2f} {unit}", file=sys.stderr)
+
+
+# ------------------ Cold start ------------------
+def bench_cold_start(results, server, runs):
+    totals, first_paints = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as profile:
+            env = dict(os.environ, COBALT_DATA_DIR=make_profile(profile, server))
+            out = subprocess.run(
+                [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup-json", "-", "--exit-after-startup"],
+                env=env, cwd=ROOT, check=True, capture_output=True, text=True, timeout=120).stdout
+            report, _ = json.JSONDecoder().raw_decode(out[out.index("{"):])
+            totals.append(report["total_ms"])
+            first_paints.append(report["cumulative_ms"].get("first_paint", 0.0))
+    results.add("cold_start_ms", statistics.median(totals), "ms")
+    results.add("cold_first_paint_ms", statistics.median(first_paints), "ms")
+
+
+# ------------------ In-process browser ------------------
+def bench_browser(results, server, tabs, loads, queries):
+    from metrics import process_rss_kb
+    from shortcuts import Shortcuts
+    from ui import Browser
+
+    browser = Browser()
+    Shortcuts(browser)
+    browser.show()
+    loaded = []
+    browser.first_page_loaded.connect(lambda: loaded.append(True))
+    wait_until(lambda: loaded)
+
+    # Page load latency: loadStarted → loadFinished in the current tab, as the task manager sees it
+    tab = browser.tabs.currentWidget()
+    web_view = browser.web_view(tab)
+    samples, finished_loads = [], []
+    web_view.loadFinished.connect(finished_loads.append)
+    for i in range(loads):
+        before = len(finished_loads)
+        web_view.load(QUrl(server.page_url(f"load-{i}")))
+        wait_until(lambda: len(finished_loads) > before)
+        samples.append(tab.load_ms)
+    results.add("page_load_p50_ms", statistics.median(samples), "ms")
+    results.add("page_load_p95_ms", percentile(samples, 0.95), "ms")
+
+    # Open N tabs with Ctrl+T, as a user would, until every one has finished loading
+    baseline_tabs = browser.tabs.count()
+    finished = set()
+    start = time.perf_counter()
+    for _ in range(tabs):
+        QApplication.sendEvent(browser, QKeyEvent(QEvent.KeyPress, Qt.Key_T, Qt.ControlModifier))
+        new_tab = browser.tabs.currentWidget()
+        browser.web_view(new_tab).loadFinished.connect(lambda ok, t=new_tab: finished.add(t))
+    wait_until(lambda: len(finished) >= tabs, timeout_ms=120000)
+    elapsed = time.perf_counter() - start
+    results.add("open_tabs_ms", elapsed * 1000, "ms")
+    results.add("open_tab_avg_ms", elapsed * 1000 / tabs, "ms")
+
+    # Background tabs (as from a bookmark folder's "Open All in Tabs"), throttled by the load scheduler
+    preload_tabs = [browser.add_tab(server.page_url(f"background-{i}"), f"Background {i}", background=True,
+                                    preload=True) for i in range(tabs)]
+    start = time.perf_counter()
+    wait_until(lambda: all(getattr(t, "load_ms", None) is not None for t in preload_tabs), timeout_ms=120000)
+    results.add("background_tabs_ms", (time.perf_counter() - start) * 1000, "ms")
+    loads = browser.load_stats()
+    results.add("load_queue_max_depth", loads["max_queue_depth"], "tabs")
+    results.add("load_queue_wait_p95_ms", loads["wait_ms"].get("p95", 0.0), "ms")
+
+    # RSS: the browser process plus each distinct live renderer, spread over the open tabs
+    report = browser.task_report()
+    renderers = {row["pid"]: row["rss_kb"] or 0 for row in report if row["pid"]}
+    total_kb = (process_rss_kb(os.getpid()) or 0) + sum(renderers.values())
+    results.add("rss_total_mb", total_kb / 1024, "MB")
+    results.add("rss_per_tab_mb", total_kb / 1024 / max(1, browser.tabs.count()), "MB")
+    results.add("renderer_processes", len(renderers), "processes")
+    assert browser.tabs.count() == baseline_tabs + 2 * tabs
+
+    # Omnibox: time from the last keystroke until the server's suggestions are in the popup list
+    url_bar = browser.url_bar
+    completer = url_bar.completer()
+    browser.activateWindow()
+    url_bar.setFocus()
+    latencies = []
+    for i in range(queries):
+        query = f"bench{i} query"
+        url_bar.clear()
+        QTest.keyClicks(url_bar, query)
+        typed_at = time.perf_counter()
+        expected = f"{query} suggestion 0"
+        wait_until(lambda: expected in completer.model().stringList(), timeout_ms=10000)
+        latencies.append((time.perf_counter() - typed_at) * 1000)
+    results.add("suggestion_p50_ms", statistics.median(latencies), "ms")
+    results.add("suggestion_p95_ms", percentile(latencies, 0.95), "ms")
+
+    # Prefetch: a page visited often enough that typing its address is a confident
+    # match gets fetched by the hidden page; then the real navigation is timed
+    from omnibox import CONFIDENT_VISITS
+    from webprofile import MAX_PER_MINUTE
+    prefetched = []
+    for i in range(min(queries, MAX_PER_MINUTE // 2)):  # stay clear of the prefetcher's rate cap
+        url = server.page_url(f"warm-{i}")
+        for _ in range(CONFIDENT_VISITS):
+            browser.omnibox_index.record_visit(url)
+        url_bar.clear()
+        QTest.keyClicks(url_bar, url.split("://", 1)[1])
+        wait_until(lambda: browser.prefetcher.was_prefetched(url), timeout_ms=15000)
+        before = len(finished_loads)
+        web_view.load(QUrl(url))
+        wait_until(lambda: len(finished_loads) > before)
+        prefetched.append(tab.load_ms)
+    QTest.qWait(500)  # the last page's cache statistics arrive asynchronously
+    results.add("prefetched_load_p50_ms", statistics.median(prefetched), "ms")
+    network = browser.network_stats()
+    results.add("prefetch_saved_p50_ms", network["time_saved_ms"].get("p50", 0.0), "ms", better="higher")
+    results.add("cache_hit_rate", network["cache_hit_rate"] or 0.0, "ratio", better="higher")
+
+    browser.close()
+
+
+# ------------------ Updater ------------------
+def bench_updater(results, server, size_mb):
+    from PyQt5.QtNetwork import QNetworkAccessManager
+    from downloads import Download
+    from updater import Updater
+
+    payload = os.urandom(int(size_mb * 1024 * 1024))
+    server.add_file("cobalt_browser.exe", payload)
+    feed_url = server.set_update_feed("1.0.2", "cobalt_browser.exe")
+
+    updater = Updater(None, "1.0.2", feed_url)
+    checked = []
+    updater.checkFinished.connect(checked.append)
+    start = time.perf_counter()
+    updater.check(silent=True)
+    wait_until(lambda: checked)
+    results.add("update_check_ms", (time.perf_counter() - start) * 1000, "ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        download = Download(QNetworkAccessManager(), server.url("/files/cobalt_browser.exe"),
+                            os.path.join(tmp, "cobalt_browser.exe"))
+        done = []
+        download.finished.connect(lambda ok, error: done.append(ok))
+        start = time.perf_counter()
+        download.start()
+        wait_until(lambda: done, timeout_ms=300000)
+        elapsed = time.perf_counter() - start
+    if not done[0]:
+        raise RuntimeError("update download failed")
+    results.add("update_download_mb_s", size_mb / elapsed, "MB/s", better="higher")
+
+
+# ------------------ Comparison ------------------
+def compare(current, baseline, threshold):
+    """Prints a table against the baseline and returns the names of regressed metrics."""
+    regressions = []
+    print(f"{'metric':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, metric in current["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<28}{'-':>12}{metric['value']:>12.2f}")
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = change > threshold if metric["better"] == "lower" else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"{name:<28}{base['value']:>12.2f}{metric['value']:>12.2f}{change:>+10.1%}"
+              + ("  REGRESSION" if worse else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=20, help="tabs opened with Ctrl+T")
+    parser.add_argument("--loads", type=int, default=10, help="page loads in one tab")
+    parser.add_argument("--queries", type=int, default=10, help="omnibox queries typed")
+    parser.add_argument("--starts", type=int, default=3, help="cold starts (median is reported)")
+    parser.add_argument("--download-mb", type=float, default=64)
+    parser.add_argument("--page-kb", type=int, default=64, help="size of each synthetic page")
+    parser.add_argument("--skip", nargs="*", default=[], choices=("cold_start", "browser", "updater"))
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed regression as a fraction of the baseline (default %(default)s)")
+    args = parser.parse_args()
+
+    server = StandInServer(page_kb=args.page_kb).start()
+    results = Results()
+    try:
+        if "cold_start" not in args.skip:
+            bench_cold_start(results, server, args.starts)
+
+        with tempfile.TemporaryDirectory() as profile:
+            os.environ["COBALT_DATA_DIR"] = make_profile(profile, server)
+            app = QApplication(sys.argv[:1])
+            if "browser" not in args.skip:
+                bench_browser(results, server, args.tabs, args.loads, args.queries)
+            if "updater" not in args.skip:
+                bench_updater(results, server, args.download_mb)
+            app.processEvents()
+    finally:
+        server.stop()
+
+    current = {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "metrics": results.metrics,
+    }
+    text = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: "
+                  + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
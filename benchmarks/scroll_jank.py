@@ -0,0 +1,149 @@
+# benchmarks/scroll_jank.py
+"""
+Frame times while scrolling a long local page, with the smooth-scroll user
+script installed and without it. Real wheel and key events are sent to the
+view, and the page records requestAnimationFrame deltas while it scrolls.
+Each mode runs in its own process, because Chromium reads its switches once:
+the "on" run gets --enable-smooth-scrolling, as main.py would pass it.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.scroll_jank
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from PyQt5.QtCore import Qt, QUrl, QPoint, QPointF, QTimer, QEventLoop
+from PyQt5.QtGui import QWheelEvent, QKeyEvent
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile
+
+from ui import install_smooth_scroll
+
+PAGE_PARAGRAPHS = 4000
+JANK_MS = 1000 / 30  # a frame slower than this is a visible stutter
+SMOOTH_SCROLL_FLAG = "--enable-smooth-scrolling"
+
+START_RECORDING = """
+window.__frames = [];
+(function tick(last) {
+    requestAnimationFrame(function(now) {
+        if (last) window.__frames.push(now - last);
+        tick(now);
+    });
+})();
+"""
+
+
+def write_long_page(directory):
+    path = os.path.join(directory, "long.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!doctype html><html><body>")
+        for i in range(PAGE_PARAGRAPHS):
+            f.write(f"<p style='box-shadow:0 0 4px #888'>Paragraph {i}: "
+                    "Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>")
+        f.write("</body></html>")
+    return path
+
+
+def wait(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def run_js(page, js):
+    loop, result = QEventLoop(), []
+    page.runJavaScript(js, lambda value: (result.append(value), loop.quit()))
+    loop.exec_()
+    return result[0]
+
+
+def measure(view, page_url, duration_ms, enabled):
+    install_smooth_scroll(QWebEngineProfile.defaultProfile(), enabled)
+    loop = QEventLoop()
+    view.loadFinished.connect(loop.quit)
+    view.load(page_url)
+    loop.exec_()
+    view.loadFinished.disconnect(loop.quit)
+
+    target = view.focusProxy() or view
+    run_js(view.page(), START_RECORDING)
+    elapsed = 0
+    while elapsed < duration_ms:
+        center = QPointF(view.width() / 2, view.height() / 2)
+        wheel = QWheelEvent(center, QPointF(view.mapToGlobal(QPoint(0, 0))) + center, QPoint(),
+                            QPoint(0, -120), Qt.NoButton, Qt.NoModifier, Qt.NoScrollPhase, False)
+        QApplication.sendEvent(target, wheel)
+        if elapsed % 160 == 0:
+            QApplication.sendEvent(target, QKeyEvent(QKeyEvent.KeyPress, Qt.Key_Down, Qt.NoModifier))
+            QApplication.sendEvent(target, QKeyEvent(QKeyEvent.KeyRelease, Qt.Key_Down, Qt.NoModifier))
+        wait(16)
+        elapsed += 16
+
+    frames = sorted(run_js(view.page(), "window.__frames") or [])
+    if not frames:
+        return {"frames": 0}
+    pick = lambda q: round(frames[min(len(frames) - 1, int(q * len(frames)))], 2)
+    return {
+        "frames": len(frames),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(frames[-1], 2),
+        "janky_frames": sum(1 for f in frames if f > JANK_MS),
+    }
+
+
+def worker(mode, duration_ms):
+    app = QApplication(sys.argv[:1])
+    view = QWebEngineView()
+    view.resize(1000, 700)
+    view.show()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        page_url = QUrl.fromLocalFile(write_long_page(tmp))
+        result = measure(view, page_url, duration_ms, enabled=mode == "on")
+    print(json.dumps(result))
+    view.close()
+    app.processEvents()
+
+
+def chromium_flags(mode):
+    # Start from whatever the caller set, minus our flag, so the "off" run really is off
+    flags = [f for f in os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split() if f != SMOOTH_SCROLL_FLAG]
+    if mode == "on":
+        flags.append(SMOOTH_SCROLL_FLAG)
+    return " ".join(flags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration-ms", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--worker", choices=["off", "on"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.duration_ms)
+        return
+
+    results = {}
+    for mode in ("off", "on"):
+        env = dict(os.environ, QTWEBENGINE_CHROMIUM_FLAGS=chromium_flags(mode))
+        out = subprocess.run([sys.executable, "-m", "benchmarks.scroll_jank", "--worker", mode,
+                              "--duration-ms", str(args.duration_ms)],
+                             env=env, check=True, capture_output=True, text=True, timeout=600).stdout
+        results[f"script_{mode}"] = json.loads(out.strip().splitlines()[-1])
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for mode, stats in results.items():
+            print(f"{mode:<11} " + "  ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/server.py
+"""
+Local HTTP stand-in for the services the browser talks to. Runs in a
+background thread on an ephemeral port.
+
+Files registered with add_file() are served from /files/<name> with an ETag
+and HTTP Range support; cut_after/cut_times make the first few responses
+drop the connection partway through the body.
+
+It also serves:
+- /pages/<name>: a synthetic HTML page of roughly page_kb KiB.
+- /complete/search?q=...: suggestion JSON in the format SuggestionProvider reads.
+- /updates.json: the feed set with set_update_feed(), answering If-None-Match with 304.
+"""
+import hashlib
+import html
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+PARAGRAPH = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+             "incididunt ut labore et dolore magna aliqua. ")
+
+
+class StandInServer:
+    def __init__(self, page_kb=64, suggestions=8, host="127.0.0.1"):
+        self.files = {}
+        self.page_kb = page_kb
+        self.suggestions = suggestions
+        self.feed = None
+        self.requests = []  # (method, path, headers) for every request served
+        self.host = host  # other 127.x.y.z addresses (Linux) count as separate sites to Chromium
+        self._httpd = ThreadingHTTPServer((host, 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def url(self, path):
+        return f"http://{self.host}:{self.port}{path}"
+
+    def add_file(self, name, data, cut_after=None, cut_times=0):
+        self.files[name] = {
+            "data": data,
+            "etag": '"%s"' % hashlib.sha256(data).hexdigest()[:16],
+            "cut_after": cut_after,
+            "cuts_left": cut_times,
+        }
+        return self.url(f"/files/{name}")
+
+    def page_url(self, name):
+        return self.url(f"/pages/{name}")
+
+    def suggest_url(self):
+        return self.url("/complete/search")
+
+    def set_update_feed(self, version, file_name, sha256=None, deltas=None):
+        """Publishes /updates.json pointing at a file registered with add_file()."""
+        if sha256 is None:
+            sha256 = hashlib.sha256(self.files[file_name]["data"]).hexdigest()
+        body = json.dumps({"version": version, "url": self.url(f"/files/{file_name}"),
+                           "sha256": sha256, "deltas": deltas or {}}).encode()
+        self.feed = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:16])
+        return self.url("/updates.json")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self.do_GET(head=True)
+
+        def do_GET(self, head=False):
+            server.requests.append((self.command, self.path, dict(self.headers)))
+            path = urlsplit(self.path)
+            if path.path.startswith("/files/"):
+                return self._serve_file(path.path[len("/files/"):], head)
+            if path.path.startswith("/pages/"):
+                return self._serve_page(path.path[len("/pages/"):], head)
+            if path.path == "/complete/search":
+                return self._serve_suggestions(parse_qs(path.query).get("q", [""])[0], head)
+            if path.path == "/updates.json" and server.feed is not None:
+                return self._serve_feed(head)
+            self.send_error(404)
+
+        def _send_body(self, status, content_type, body, head, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def _serve_page(self, name, head):
+            title = html.escape(name)
+            paragraphs = max(1, server.page_kb * 1024 // (len(PARAGRAPH) + 20))
+            body = "".join(f"<p>{i}. {PARAGRAPH}</p>" for i in range(paragraphs))
+            page = (f"<!doctype html><html><head><title>Page {title}</title>"
+                    "<style>p { font: 14px sans-serif; margin: 0 0 8px; }</style></head>"
+                    f"<body><h1>Page {title}</h1>{body}</body></html>").encode()
+            self._send_body(200, "text/html; charset=utf-8", page, head)
+
+        def _serve_suggestions(self, query, head):
+            suggestions = [f"{query} suggestion {i}" for i in range(server.suggestions)]
+            body = json.dumps([query, suggestions]).encode()
+            self._send_body(200, "application/json", body, head)
+
+        def _serve_feed(self, head):
+            body, etag = server.feed
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_body(200, "application/json", body, head, [("ETag", etag)])
+
+        def _serve_file(self, name, head):
+            entry = server.files.get(name)
+            if entry is None:
+                return self.send_error(404)
+            data, etag = entry["data"], entry["etag"]
+            start, end, status = 0, len(data) - 1, 200
+
+            range_header = self.headers.get("Range", "")
+            if_range = self.headers.get("If-Range")
+            if range_header.startswith("bytes=") and (if_range is None or if_range == etag):
+                first, _, last = range_header[len("bytes="):].partition("-")
+                start = int(first or 0)
+                end = min(int(last), end) if last else end
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206
+
+            body = data[start:end + 1]
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            self.end_headers()
+            if head:
+                return
+
+            if entry["cuts_left"] > 0 and entry["cut_after"] is not None:
+                entry["cuts_left"] -= 1
+                self.wfile.write(body[:entry["cut_after"]])
+                self.wfile.flush()
+                self.close_connection = True
+                self.connection.shutdown(2)  # drop the socket mid-body
+                return
+            self.wfile.write(body)
+
+    return Handler
@@ -0,0 +1,111 @@
+# benchmarks/tab_open.py
+"""
+Cost of opening many tabs: wall time, live widget count and browser-process
+RSS. "shared" is the current window with one navigation bar; "legacy" adds
+back the per-tab bar (three buttons, a line edit, a completer and a layout in
+every tab) that add_tab used to build, for a before/after comparison. Each
+mode runs in its own process against a throwaway profile.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.tab_open --tabs 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("legacy", "shared")
+
+
+def add_legacy_nav(browser, tab):
+    """The navigation bar add_tab built for every tab before it became shared."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QHBoxLayout, QLineEdit, QPushButton, QCompleter
+
+    nav_layout = QHBoxLayout()
+    back_btn, forward_btn, reload_btn = QPushButton("←"), QPushButton("→"), QPushButton("⟳")
+    url_bar = QLineEdit()
+    url_bar.setPlaceholderText("Search or enter web address")
+    url_bar.setStyleSheet("QLineEdit { border-radius: 12px; padding: 4px; border: 1px solid gray; }")
+    url_bar._user_typing = False
+    url_bar.installEventFilter(browser)
+    completer = QCompleter([], url_bar)
+    completer.setCaseSensitivity(Qt.CaseInsensitive)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    url_bar.setCompleter(completer)
+    url_bar.textEdited.connect(lambda text: browser.fetch_online_suggestions(text, completer))
+    for widget in (back_btn, forward_btn, reload_btn, url_bar):
+        nav_layout.addWidget(widget)
+    tab.layout().insertLayout(0, nav_layout)
+    url_bar.returnPressed.connect(lambda: browser.load_url(browser.web_view(tab), url_bar))
+    back_btn.clicked.connect(lambda: browser.web_view(tab).back())
+    forward_btn.clicked.connect(lambda: browser.web_view(tab).forward())
+    reload_btn.clicked.connect(lambda: browser.web_view(tab).reload())
+
+
+def worker(mode, tabs):
+    from PyQt5.QtWidgets import QApplication
+    from metrics import process_rss_kb
+    from ui import Browser
+
+    app = QApplication(sys.argv[:1])
+    browser = Browser()
+    browser.show()
+    app.processEvents()
+    widgets_before = len(QApplication.allWidgets())
+    rss_before = process_rss_kb(os.getpid()) or 0
+
+    start = time.perf_counter()
+    for i in range(tabs):
+        tab = browser.add_tab(None, f"Tab {i}")
+        if mode == "legacy":
+            add_legacy_nav(browser, tab)
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    rss_after = process_rss_kb(os.getpid()) or 0
+    result = {
+        "mode": mode,
+        "tabs": tabs,
+        "open_ms": round(elapsed * 1000, 1),
+        "per_tab_ms": round(elapsed * 1000 / tabs, 2),
+        "widgets_added": len(QApplication.allWidgets()) - widgets_before,
+        "rss_added_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.tabs)
+        return
+
+    results = []
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as profile:
+            env = dict(os.environ, COBALT_DATA_DIR=profile)
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+            out = subprocess.run([sys.executable, "-m", "benchmarks.tab_open", "--worker", mode,
+                                  "--tabs", str(args.tabs)], env=env, check=True,
+                                 capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mode':<8}{'open ms':>10}{'ms/tab':>9}{'widgets':>10}{'RSS MB':>9}")
+        for r in results:
+            print(f"{r['mode']:<8}{r['open_ms']:>10.1f}{r['per_tab_ms']:>9.2f}"
+                  f"{r['widgets_added']:>10}{r['rss_added_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
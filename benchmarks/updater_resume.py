@@ -0,0 +1,92 @@
+# benchmarks/updater_resume.py
+"""
+Downloads a payload through downloads.Download (the engine the updater and the
+Downloads window share) from the local stand-in server, which drops the
+connection partway through the first few responses. Runs it as one stream,
+split into parallel Range segments, and segmented under a bandwidth cap.
+Checks that every drop resumes with a Range request instead of starting over,
+that the streamed SHA256 and the file on disk match, and that the cap holds;
+reports throughput for each. Exits non-zero on failure.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.updater_resume
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtNetwork import QNetworkAccessManager
+
+import downloads
+from downloads import Download, TokenBucket
+from benchmarks.server import StandInServer
+
+
+def run(app, payload, segments, cuts, cap_mb_s=0):
+    expected = hashlib.sha256(payload).hexdigest()
+    segment_size = -(-len(payload) // segments)
+    server = StandInServer().start()
+    url = server.add_file("cobalt_browser.exe", payload, cut_after=segment_size // (cuts + 2), cut_times=cuts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "cobalt_browser.exe")
+        bucket = TokenBucket(int(cap_mb_s * 1024 * 1024)) if cap_mb_s else None
+        download = Download(QNetworkAccessManager(), url, dest, bucket=bucket, max_segments=segments)
+        result = {}
+        download.finished.connect(lambda ok, error: (result.update(ok=ok, error=error), app.quit()))
+
+        start = time.perf_counter()
+        download.start()
+        app.exec_()
+        elapsed = time.perf_counter() - start
+
+        ranged = sum(1 for _, _, headers in server.requests if "Range" in headers)
+        with open(dest, "rb") if result.get("ok") else open(os.devnull, "rb") as f:
+            on_disk = hashlib.sha256(f.read()).hexdigest()
+        requests = len(server.requests)
+        server.stop()
+
+    mb_s = len(payload) / elapsed / (1024 * 1024)
+    label = f"{segments} segment(s)" + (f", capped at {cap_mb_s:g} MB/s" if cap_mb_s else "")
+    checks = {
+        f"{label}: download succeeded": result.get("ok", False),
+        f"{label}: streamed sha256 matches payload": download.sha256() == expected,
+        f"{label}: file on disk matches payload": on_disk == expected,
+        f"{label}: resumed {cuts} times": download.resumes == cuts,
+        f"{label}: only segments and resumes used Range": ranged == len(download.segments) - 1 + cuts,
+    }
+    if cap_mb_s:
+        # One burst's worth of slack on top of the cap
+        checks[f"{label}: stayed under the cap"] = mb_s <= cap_mb_s * (1 + downloads.BUCKET_BURST) + 0.5
+    if not result.get("ok"):
+        print(f"{label}: error:", result.get("error"))
+    print(f"{label}: {mb_s:.1f} MB/s over {requests} requests")
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=32)
+    parser.add_argument("--cuts", type=int, default=3, help="connections to drop before letting it finish")
+    parser.add_argument("--segments", type=int, default=downloads.MAX_SEGMENTS)
+    parser.add_argument("--cap-mb-s", type=float, default=8, help="bandwidth cap for the capped run")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    downloads.RETRY_BASE_DELAY = 10  # don't let backoff dominate the measurement
+
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    checks = {}
+    checks.update(run(app, payload, 1, args.cuts))
+    checks.update(run(app, payload, args.segments, args.cuts))
+    checks.update(run(app, payload, args.segments, args.cuts, cap_mb_s=args.cap_mb_s))
+    for name, passed in checks.items():
+        print(f"[{'ok' if passed else 'FAIL'}] {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
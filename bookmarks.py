@@ -0,0 +1,298 @@
+# bookmarks.py
+import html
+import sqlite3
+import time
+from bisect import bisect_left
+from html.parser import HTMLParser
+
+ROOT = 0                 # parent id of top-level bookmarks and folders
+SEARCH_RESULTS = 20
+IMPORT_CHUNK = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id        INTEGER PRIMARY KEY,
+    parent    INTEGER NOT NULL DEFAULT 0,
+    is_folder INTEGER NOT NULL DEFAULT 0,
+    title     TEXT NOT NULL DEFAULT '',
+    url       TEXT NOT NULL DEFAULT '',
+    tags      TEXT NOT NULL DEFAULT '',
+    position  INTEGER NOT NULL DEFAULT 0,
+    added     REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS bookmarks_parent ON bookmarks(parent, position);
+"""
+
+
+class Bookmark:
+    __slots__ = ("id", "parent", "is_folder", "title", "url", "tags", "added")
+
+    def __init__(self, id, parent, is_folder, title, url, tags, added):
+        self.id = id
+        self.parent = parent
+        self.is_folder = bool(is_folder)
+        self.title = title
+        self.url = url
+        self.tags = tuple(t for t in tags.split(",") if t) if isinstance(tags, str) else tuple(tags)
+        self.added = added
+
+
+def _search_keys(bookmark):
+    text = bookmark.url.lower()
+    for prefix in ("https://", "http://", "file://"):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    host = text.split("/", 1)[0]
+    keys = {text, text[4:] if text.startswith("www.") else text}
+    keys.update(part for part in host.split(".") if len(part) > 1)
+    keys.update(word for word in bookmark.title.lower().split() if len(word) > 1)
+    keys.update(tag.lower() for tag in bookmark.tags)
+    keys.discard("")
+    return keys
+
+
+class BookmarkIndex:
+    """
+    Prefix search over bookmark titles, URLs and tags. Like the omnibox index it
+    keeps every key in one sorted list; a multi-word query is answered from the
+    word with the narrowest key range and filtered by the others.
+    """
+    def __init__(self):
+        self._bookmarks = {}
+        self._keys = []  # sorted (key, id)
+
+    def __len__(self):
+        return len(self._bookmarks)
+
+    def load(self, bookmarks):
+        for bookmark in bookmarks:
+            self._bookmarks[bookmark.id] = (bookmark, _search_keys(bookmark))
+        self._keys = sorted((key, id) for id, (_, keys) in self._bookmarks.items() for key in keys)
+
+    def add(self, bookmark):
+        self.remove(bookmark.id)
+        keys = _search_keys(bookmark)
+        self._bookmarks[bookmark.id] = (bookmark, keys)
+        for key in keys:
+            pos = bisect_left(self._keys, (key, bookmark.id))
+            self._keys.insert(pos, (key, bookmark.id))
+
+    def remove(self, id):
+        item = self._bookmarks.pop(id, None)
+        if item is None:
+            return
+        for key in item[1]:
+            pos = bisect_left(self._keys, (key, id))
+            if pos < len(self._keys) and self._keys[pos] == (key, id):
+                del self._keys[pos]
+
+    def _range(self, prefix):
+        return bisect_left(self._keys, (prefix,)), bisect_left(self._keys, (prefix + "\uffff",))
+
+    def search(self, text, limit=SEARCH_RESULTS):
+        words = text.lower().split()
+        if not words:
+            return []
+        ranges = sorted((self._range(word), word) for word in words)
+        (start, end), _ = min(ranges, key=lambda r: r[0][1] - r[0][0])
+        others = [word for _, word in ranges]
+        results, seen = [], set()
+        for pos in range(start, end):
+            id = self._keys[pos][1]
+            if id in seen:
+                continue
+            seen.add(id)
+            bookmark, keys = self._bookmarks[id]
+            if all(any(key.startswith(word) for key in keys) for word in others):
+                results.append(bookmark)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class BookmarkStore:
+    """
+    Bookmarks and folders in SQLite. Menus read one folder at a time through
+    children(); the search index is only built the first time it's needed.
+    `generation` changes on every edit so cached menus know to rebuild.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.generation = 0
+        self._index = None
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def _row(self, row):
+        return Bookmark(*row)
+
+    def _changed(self):
+        self.generation += 1
+
+    # ---------- Reads ----------
+    def children(self, parent=ROOT, limit=-1):
+        rows = self._db.execute(
+            "SELECT id, parent, is_folder, title, url, tags, added FROM bookmarks "
+            "WHERE parent = ? ORDER BY position LIMIT ?", (parent, limit))
+        return [self._row(row) for row in rows]
+
+    def count(self, parent=None):
+        if parent is None:
+            return self._db.execute("SELECT COUNT(*) FROM bookmarks WHERE is_folder = 0").fetchone()[0]
+        return self._db.execute("SELECT COUNT(*) FROM bookmarks WHERE parent = ?", (parent,)).fetchone()[0]
+
+    def urls(self):
+        """(url, title) of every bookmark, e.g. for seeding the omnibox."""
+        return self._db.execute("SELECT url, title FROM bookmarks WHERE is_folder = 0").fetchall()
+
+    def search(self, text, limit=SEARCH_RESULTS):
+        return self.index.search(text, limit)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = BookmarkIndex()
+            self._index.load(self._row(row) for row in self._db.execute(
+                "SELECT id, parent, is_folder, title, url, tags, added FROM bookmarks WHERE is_folder = 0"))
+        return self._index
+
+    # ---------- Writes ----------
+    def _insert(self, parent, is_folder, title, url="", tags=(), added=None, position=None):
+        if position is None:
+            position = self._db.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM bookmarks WHERE parent = ?", (parent,)).fetchone()[0]
+        added = time.time() if added is None else added
+        cur = self._db.execute(
+            "INSERT INTO bookmarks (parent, is_folder, title, url, tags, position, added) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (parent, int(is_folder), title, url, ",".join(tags), position, added))
+        bookmark = Bookmark(cur.lastrowid, parent, is_folder, title, url, tags, added)
+        if not is_folder and self._index is not None:
+            self._index.add(bookmark)
+        return bookmark
+
+    def add(self, url, title, parent=ROOT, tags=()):
+        with self._db:
+            bookmark = self._insert(parent, False, title, url, tags)
+        self._changed()
+        return bookmark
+
+    def add_folder(self, title, parent=ROOT):
+        with self._db:
+            folder = self._insert(parent, True, title)
+        self._changed()
+        return folder
+
+    def remove(self, id):
+        """Removes a bookmark, or a folder and everything under it."""
+        with self._db:
+            pending = [id]
+            while pending:
+                current = pending.pop()
+                pending.extend(row[0] for row in self._db.execute(
+                    "SELECT id FROM bookmarks WHERE parent = ?", (current,)))
+                self._db.execute("DELETE FROM bookmarks WHERE id = ?", (current,))
+                if self._index is not None:
+                    self._index.remove(current)
+        self._changed()
+
+    def close(self):
+        self._db.close()
+
+    # ---------- Netscape bookmark file ----------
+    def import_html(self, path, parent=ROOT):
+        """
+        Imports a Netscape-format bookmarks.html (what every browser exports) under
+        parent. The file is parsed in chunks as it's read, inside one transaction.
+        Returns the number of bookmarks added.
+        """
+        parser = _NetscapeParser(self, parent)
+        self._index = None  # rebuilt with one sort on the next search
+        with self._db, open(path, encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(IMPORT_CHUNK)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+            parser.close()
+        self._changed()
+        return parser.added
+
+    def export_html(self, path):
+        """Writes every bookmark as a Netscape-format file, one folder at a time."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n"
+                    '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+                    "<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n")
+            self._export_folder(f, ROOT, 1)
+            f.write("</DL><p>\n")
+
+    def _export_folder(self, f, parent, depth):
+        indent = "    " * depth
+        for item in self.children(parent):
+            if item.is_folder:
+                f.write(f'{indent}<DT><H3 ADD_DATE="{int(item.added)}">{html.escape(item.title)}</H3>\n'
+                        f"{indent}<DL><p>\n")
+                self._export_folder(f, item.id, depth + 1)
+                f.write(f"{indent}</DL><p>\n")
+            else:
+                tags = f' TAGS="{html.escape(",".join(item.tags))}"' if item.tags else ""
+                f.write(f'{indent}<DT><A HREF="{html.escape(item.url)}" ADD_DATE="{int(item.added)}"{tags}>'
+                        f"{html.escape(item.title)}</A>\n")
+
+
+class _NetscapeParser(HTMLParser):
+    # <H3> names a folder whose contents follow in the next <DL>; </DL> closes it
+    def __init__(self, store, parent):
+        super().__init__(convert_charrefs=True)
+        self.store = store
+        self.folders = [parent]
+        self.positions = {}
+        self.pending_folder = None
+        self.current = None  # ("a", attrs) or ("h3", attrs) while collecting text
+        self.text = []
+        self.added = 0
+
+    def _position(self, parent):
+        if parent not in self.positions:
+            self.positions[parent] = self.store.count(parent)
+        position = self.positions[parent]
+        self.positions[parent] += 1
+        return position
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("a", "h3"):
+            self.current, self.text = (tag, dict(attrs)), []
+        elif tag == "dl" and self.pending_folder is not None:
+            self.folders.append(self.pending_folder)
+            self.pending_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == "dl":
+            if len(self.folders) > 1:
+                self.folders.pop()
+            return
+        if self.current is None or tag != self.current[0]:
+            return
+        kind, attrs = self.current
+        self.current = None
+        title = "".join(self.text).strip()
+        parent = self.folders[-1]
+        try:
+            added = float(attrs.get("add_date") or 0) or None
+        except ValueError:
+            added = None
+        if kind == "h3":
+            self.pending_folder = self.store._insert(
+                parent, True, title, added=added, position=self._position(parent)).id
+        elif attrs.get("href"):
+            tags = [t.strip() for t in (attrs.get("tags") or "").split(",") if t.strip()]
+            self.store._insert(parent, False, title or attrs["href"], attrs["href"], tags,
+                               added=added, position=self._position(parent))
+            self.added += 1
+
+    def handle_data(self, data):
+        if self.current is not None:
+            self.text.append(data)
@@ -0,0 +1,45 @@
+# closedtabs.py
+from collections import deque
+from hibernation import TabSnapshot
+from session import MAX_CLOSED_TABS
+
+MAX_CLOSED_BYTES = 8 * 1024 * 1024  # serialized history kept for closed tabs, all together
+
+
+class ClosedTabStack:
+    """
+    Recently closed tabs as TabSnapshots (URL, title, serialized history and
+    scroll offset), most recent last. Bounded by entry count and by total
+    snapshot size; the oldest entries are evicted first.
+    """
+    def __init__(self, max_entries=MAX_CLOSED_TABS, max_bytes=MAX_CLOSED_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evicted = 0
+        self._stack = deque()
+
+    @classmethod
+    def from_session(cls, closed, **limits):
+        """Seeds the stack from SessionJournal.closed, which only has (url, title, closed_id) from earlier runs."""
+        stack = cls(**limits)
+        for url, title, closed_id in closed:
+            stack.push(TabSnapshot(url, title, closed_id=closed_id))
+        return stack
+
+    def __len__(self):
+        return len(self._stack)
+
+    def push(self, snapshot):
+        self._stack.append(snapshot)
+        self.bytes += snapshot.nbytes()
+        while len(self._stack) > self.max_entries or (self.bytes > self.max_bytes and len(self._stack) > 1):
+            self.bytes -= self._stack.popleft().nbytes()
+            self.evicted += 1
+
+    def pop(self):
+        if not self._stack:
+            return None
+        snapshot = self._stack.pop()
+        self.bytes -= snapshot.nbytes()
+        return snapshot
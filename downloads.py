@@ -0,0 +1,649 @@
+# downloads.py
+import hashlib
+import json
+import os
+import time
+from PyQt5.QtCore import Qt, QObject, QUrl, QTimer, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QHeaderView, QLabel, QSpinBox
+)
+from storage import settings, download_bandwidth_limit
+
+MAX_SEGMENTS = 4                     # parallel connections per file when the server takes Range
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024   # files under two of these are fetched in one piece
+READ_BUFFER = 256 * 1024             # per connection; a throttled reply stops the socket here
+HASH_CHUNK = 65536
+SAVE_INTERVAL = 1.0                  # s between progress checkpoints in the .part.json file
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1000              # ms, doubled per consecutive failure
+RETRY_MAX_DELAY = 30000
+BUCKET_TICK = 50                     # ms between token refills while a download is throttled
+BUCKET_BURST = 0.25                  # s of bandwidth a bucket can save up
+MAX_FINISHED = 100                   # finished downloads remembered in downloads.json
+SAMPLE_INTERVAL = 1000               # ms, Downloads window refresh while it's open
+
+
+def _content_range(value):
+    # "bytes 100-999/1000" → (100, 1000); "*" or malformed parts → 0
+    try:
+        span, total = value.split(" ", 1)[1].split("/", 1)
+        start = int(span.split("-", 1)[0]) if span != "*" else 0
+        return start, (0 if total.strip() == "*" else int(total))
+    except (IndexError, ValueError):
+        return 0, 0
+
+
+def _unique_path(path):
+    root, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(path) or os.path.exists(path + ".part"):
+        path = f"{root} ({n}){ext}"
+        n += 1
+    return path
+
+
+class TokenBucket(QObject):
+    """
+    Global bandwidth cap shared by every download (rate in bytes/s, 0 for none).
+    Connections take tokens before reading; one that gets none registers to be
+    woken on the next refill, and meanwhile its reply's read buffer fills and
+    TCP flow control slows the sender. The timer only runs while someone waits.
+    """
+    def __init__(self, rate=0, parent=None):
+        super().__init__(parent)
+        self.rate = rate
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self._waiters = {}  # key -> callback, woken in turn
+        self._timer = QTimer(self)
+        self._timer.setInterval(BUCKET_TICK)
+        self._timer.timeout.connect(self._wake)
+
+    def set_rate(self, rate):
+        self.rate = rate
+        if not rate:
+            self._wake()
+
+    def take(self, wanted):
+        if not self.rate:
+            return wanted
+        now = time.monotonic()
+        self._tokens = min(self.rate * BUCKET_BURST, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    def wait(self, key, callback):
+        self._waiters[key] = callback
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, key):
+        self._waiters.pop(key, None)
+
+    def _wake(self):
+        waiters, self._waiters = self._waiters, {}
+        for callback in waiters.values():
+            callback()  # may wait() again, which queues it behind those not yet served
+        if not self._waiters:
+            self._timer.stop()
+
+
+class Segment:
+    __slots__ = ("start", "end", "pos", "reply")
+
+    def __init__(self, start, end, pos=None):
+        self.start = start
+        self.end = end          # inclusive; None while the length is unknown
+        self.pos = start if pos is None else pos
+        self.reply = None
+
+    @property
+    def done(self):
+        return self.end is not None and self.pos > self.end
+
+
+class Download(QObject):
+    """
+    Fetches url to path through a preallocated .part file. When the server
+    accepts Range and the file is large, it is split into up to max_segments
+    pieces fetched in parallel, each written at its own offset. Progress
+    (segment offsets, ETag, length) is checkpointed in .part.json, so a paused,
+    failed or interrupted download (including across restarts) continues where
+    it stopped; a resumed range is only trusted if the server's ETag and length
+    still match. SHA256 is computed while downloading over the contiguous prefix
+    of the file, catching up from disk when an earlier segment completes.
+    """
+    PAUSED = "Paused"
+    CANCELED = "Canceled"
+
+    progress = pyqtSignal("qint64", "qint64")  # bytes received, total bytes (0 if unknown)
+    finished = pyqtSignal(bool, str)           # ok, error message (PAUSED/CANCELED when stopped)
+    changed = pyqtSignal()                     # state changed
+
+    def __init__(self, nam, url, path, parent=None, bucket=None, max_segments=MAX_SEGMENTS,
+                 user_agent=None, max_retries=MAX_RETRIES):
+        super().__init__(parent)
+        self.nam = nam
+        self.url = url
+        self.path = path
+        self.part_path = path + ".part"
+        self.meta_path = path + ".part.json"
+        self.bucket = bucket
+        self.max_segments = max_segments
+        self.user_agent = user_agent
+        self.max_retries = max_retries
+        self.state = "paused"   # running, paused, done, failed or canceled
+        self.error = ""
+        self.total = 0
+        self.etag = ""
+        self.segments = []
+        self.retries = 0
+        self.resumes = 0
+        self._file = None
+        self._hash = None
+        self._hashed = 0
+        self._saved_at = 0.0
+
+    @property
+    def received(self):
+        return sum(seg.pos - seg.start for seg in self.segments)
+
+    def sha256(self):
+        return self._hash.hexdigest().lower() if self._hash else None
+
+    # ---------- Control ----------
+    def start(self):
+        if self.state in ("running", "done"):
+            return  # a finished file has nothing to resume; starting over would replace it
+        self.state = "running"
+        self.error = ""
+        self.retries = 0
+        meta = self._read_meta()
+        if (meta.get("url") == self.url and meta.get("segments") and os.path.exists(self.part_path)
+                and all(end is not None for _, end, _ in meta["segments"])):
+            self.total = meta["length"]
+            self.etag = meta.get("etag", "")
+            self.segments = [Segment(*s) for s in meta["segments"]]
+            self._open_file()
+            self._rehash()
+            pending = [seg for seg in self.segments if not seg.done]
+            for seg in pending:
+                self._request(seg)
+            if not pending:
+                # Fully downloaded last time but never moved into place
+                QTimer.singleShot(0, self._complete)
+        else:
+            self._reset()
+            seg = Segment(0, None)
+            self.segments = [seg]
+            self._request(seg, probe=True)
+        self.changed.emit()
+
+    def pause(self):
+        """Stops the connections and keeps the partial file for start() to continue."""
+        if self.state != "running":
+            return
+        self._stop_replies()
+        self._save_meta()
+        self._close_file()
+        self.state = "paused"
+        self.changed.emit()
+        self.finished.emit(False, self.PAUSED)
+
+    def checkpoint(self):
+        """Writes segment progress to .part.json now (e.g. before the app exits)."""
+        if self.state == "running":
+            self._save_meta()
+
+    def cancel(self):
+        if self.state in ("done", "canceled"):
+            return
+        self._stop_replies()
+        self._close_file()
+        self._remove_partial()
+        self.state = "canceled"
+        self.changed.emit()
+        self.finished.emit(False, self.CANCELED)
+
+    # ---------- Requests ----------
+    def _request(self, seg, probe=False):
+        req = QNetworkRequest(QUrl(self.url))
+        req.setAttribute(QNetworkRequest.RedirectPolicyAttribute,
+                         QNetworkRequest.NoLessSafeRedirectPolicy)
+        if self.user_agent:
+            req.setRawHeader(b"User-Agent", self.user_agent.encode())
+        if not probe:
+            req.setRawHeader(b"Range", f"bytes={seg.pos}-{seg.end}".encode())
+            if self.etag:
+                # Server answers 200 with the full body if the file changed since
+                req.setRawHeader(b"If-Range", self.etag.encode())
+            if seg.pos > seg.start:
+                self.resumes += 1
+        reply = self.nam.get(req)
+        reply.setReadBufferSize(READ_BUFFER)
+        seg.reply = reply
+        reply.metaDataChanged.connect(lambda: self._on_headers(seg, reply, probe))
+        reply.readyRead.connect(lambda: self._drain(seg, reply))
+        reply.finished.connect(lambda: self._drain(seg, reply))
+
+    def _on_headers(self, seg, reply, probe):
+        if seg.reply is not reply:
+            return
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status == 416 and not probe:
+            self._restart()  # the partial runs past the end of the file: it changed on the server
+            return
+        if status is None or 300 <= status < 400 or status >= 400:
+            return  # a redirect hop, or an HTTP error that finishing the reply reports
+        etag = bytes(reply.rawHeader(b"ETag")).decode("latin-1")
+
+        if probe:
+            self.etag = etag
+            self.total = reply.header(QNetworkRequest.ContentLengthHeader) or 0
+            self._open_file(self.total)
+            if self.total:
+                seg.end = self.total - 1
+                if bytes(reply.rawHeader(b"Accept-Ranges")).strip().lower() == b"bytes":
+                    self._split(seg)
+            self._save_meta()
+            return
+
+        if status == 206:
+            start, total = _content_range(bytes(reply.rawHeader(b"Content-Range")).decode("latin-1"))
+            stale = ((etag and self.etag and etag != self.etag) or (total and total != self.total))
+            if start == seg.pos and not stale:
+                return
+        # 200 (If-Range failed) or a range that doesn't line up: the file changed on the server
+        if status == 200 and etag == self.etag:
+            self.max_segments = 1  # same file; the server just doesn't honour Range after all
+        self._restart()
+
+    def _split(self, first):
+        count = min(self.max_segments, self.total // MIN_SEGMENT_SIZE)
+        if count < 2:
+            return
+        size = -(-self.total // count)
+        first.end = size - 1  # the probe keeps streaming; it's cut off once it reaches here
+        for i in range(1, count):
+            seg = Segment(i * size, min(self.total, (i + 1) * size) - 1)
+            self.segments.append(seg)
+            self._request(seg)
+
+    def _drain(self, seg, reply):
+        if seg.reply is not reply:
+            return
+        if (reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) or 0) >= 400:
+            reply.readAll()  # an error page, not the file
+            if reply.isFinished():
+                self._segment_ended(seg, reply)
+            return
+        while reply.bytesAvailable() > 0 and not seg.done:
+            wanted = reply.bytesAvailable()
+            if seg.end is not None:
+                wanted = min(wanted, seg.end + 1 - seg.pos)
+            granted = self.bucket.take(wanted) if self.bucket is not None else wanted
+            if granted <= 0:
+                self.bucket.wait(seg, lambda: self._drain(seg, reply))
+                return
+            self._write(seg, bytes(reply.read(granted)))
+        if seg.done or reply.isFinished():
+            self._segment_ended(seg, reply)
+
+    def _write(self, seg, data):
+        if self._file is None:
+            self._open_file()
+        self._file.seek(seg.pos)
+        self._file.write(data)
+        if seg.pos == self._hashed:
+            self._hash.update(data)
+            self._hashed += len(data)
+        seg.pos += len(data)
+        self.retries = 0  # the connection is making progress again
+        self.progress.emit(self.received, self.total)
+        if time.monotonic() - self._saved_at > SAVE_INTERVAL:
+            self._save_meta()
+
+    def _segment_ended(self, seg, reply):
+        seg.reply = None
+        if self.bucket is not None:
+            self.bucket.cancel(seg)
+        if not reply.isFinished():
+            reply.abort()  # past the end of its segment
+        reply.deleteLater()
+        if self.state != "running":
+            return
+
+        if seg.end is None and not reply.error():
+            # Unknown length: the end of the stream is the end of the file
+            seg.end = seg.pos - 1
+            self.total = seg.pos
+        if seg.done:
+            self._catch_up_hash()
+            if all(s.done for s in self.segments):
+                self._complete()
+            return
+
+        # Network-layer errors (codes below 100) and short bodies are worth retrying, HTTP errors are not
+        if reply.error() < 100 and self.retries < self.max_retries:
+            self.retries += 1
+            delay = min(RETRY_BASE_DELAY * 2 ** (self.retries - 1), RETRY_MAX_DELAY)
+            QTimer.singleShot(delay, lambda: self._retry(seg))
+            return
+        self._fail(reply.errorString() if reply.error()
+                   else f"Connection closed after {self.received} of {self.total} bytes")
+
+    def _retry(self, seg):
+        if self.state != "running" or seg.reply is not None or seg not in self.segments:
+            return  # paused, or already restarted since
+        if seg.end is None:
+            self._restart()  # no length, so no ranges: start over
+        else:
+            self._request(seg)
+
+    def _restart(self):
+        self._stop_replies()
+        self._close_file()
+        self.state = "paused"
+        self._remove_partial()
+        self.start()
+
+    def _stop_replies(self):
+        for seg in self.segments:
+            reply, seg.reply = seg.reply, None
+            if self.bucket is not None:
+                self.bucket.cancel(seg)
+            if reply is not None:
+                reply.abort()
+                reply.deleteLater()
+
+    def _complete(self):
+        if self.state != "running":
+            return
+        self._catch_up_hash()
+        self._close_file()
+        try:
+            os.replace(self.part_path, self.path)
+        except OSError as e:
+            self._fail(str(e))
+            return
+        try: os.remove(self.meta_path)
+        except OSError: pass
+        self.state = "done"
+        self.changed.emit()
+        self.finished.emit(True, "")
+
+    def _fail(self, error):
+        self._stop_replies()
+        self._save_meta()
+        self._close_file()
+        self.state = "failed"
+        self.error = error
+        self.changed.emit()
+        self.finished.emit(False, error)
+
+    # ---------- Partial file ----------
+    def _open_file(self, length=0):
+        if self._file is not None:
+            return
+        existing = os.path.exists(self.part_path)
+        self._file = open(self.part_path, "r+b" if existing else "w+b")
+        if length and os.path.getsize(self.part_path) < length:
+            try:
+                os.posix_fallocate(self._file.fileno(), 0, length)
+            except (AttributeError, OSError):
+                self._file.truncate(length)  # sparse where the filesystem allows, still one extent later
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _reset(self):
+        self._close_file()
+        self._remove_partial()
+        self.total = 0
+        self.etag = ""
+        self.segments = []
+        self._hash = hashlib.sha256()
+        self._hashed = 0
+
+    def _remove_partial(self):
+        for path in (self.part_path, self.meta_path):
+            try: os.remove(path)
+            except OSError: pass
+
+    def _contiguous(self):
+        """End of the prefix of the file that's fully written."""
+        for seg in self.segments:
+            if not seg.done:
+                return seg.pos
+        return self.total
+
+    def _rehash(self):
+        self._hash = hashlib.sha256()
+        self._hashed = 0
+        self._catch_up_hash()
+
+    def _catch_up_hash(self):
+        end = self._contiguous()
+        if end <= self._hashed or self._file is None:
+            return
+        self._file.seek(self._hashed)
+        while self._hashed < end:
+            chunk = self._file.read(min(HASH_CHUNK, end - self._hashed))
+            if not chunk:
+                break
+            self._hash.update(chunk)
+            self._hashed += len(chunk)
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self):
+        self._saved_at = time.monotonic()
+        if not self.total or any(seg.end is None for seg in self.segments):
+            return  # nothing a range request could continue
+        if self._file is not None:
+            self._file.flush()  # offsets on disk never run ahead of the bytes
+        meta = {"url": self.url, "etag": self.etag, "length": self.total,
+                "segments": [[seg.start, seg.end, seg.pos] for seg in self.segments]}
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+
+class DownloadManager(QObject):
+    """
+    Runs every download through Download on one QNetworkAccessManager under a
+    shared bandwidth cap. With a profile, it mirrors the profile's cookies into
+    its own cookie jar, and take_over() handles the profile's HTTP(S) downloads
+    (anything else, like blob: URLs or saved pages, is left to QtWebEngine); the
+    owner routes downloadRequested there, so the manager can be built lazily.
+    With a state_path, the downloads it tracks are listed there; ones still
+    running at exit resume on the next start, paused ones stay paused.
+    """
+    added = pyqtSignal(object)
+
+    def __init__(self, profile=None, parent=None, state_path=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.nam = QNetworkAccessManager(self)
+        self.bucket = TokenBucket(download_bandwidth_limit() * 1024, self)
+        self.state_path = state_path
+        self.downloads = []
+        if profile is not None:
+            jar = self.nam.cookieJar()
+            store = profile.cookieStore()
+            store.cookieAdded.connect(jar.insertCookie)
+            store.cookieRemoved.connect(jar.deleteCookie)
+            store.loadAllCookies()
+        self._load_state()
+
+    def fetch(self, url, path, persist=True, start=True):
+        """
+        Starts downloading url to path. persist=False leaves it out of the list and
+        the state file (the updater drives its own); its partial file still resumes.
+        """
+        user_agent = self.profile.httpUserAgent() if self.profile is not None else None
+        download = Download(self.nam, url, path, self, bucket=self.bucket, user_agent=user_agent)
+        if persist:
+            self.downloads.append(download)
+            download.changed.connect(self.save_state)
+            self.added.emit(download)
+        if start:
+            download.start()
+        return download
+
+    def set_bandwidth_limit(self, kb_per_second):
+        self.bucket.set_rate(kb_per_second * 1024)
+        settings().setValue("download_kbps", kb_per_second)
+
+    def close(self):
+        """Saves where every running download got to; they pick up from there next start."""
+        for download in self.downloads:
+            download.checkpoint()
+        self.save_state()
+
+    def clear_finished(self):
+        self.downloads = [d for d in self.downloads if d.state not in ("done", "canceled")]
+        self.save_state()
+
+    def take_over(self, item):
+        url = item.url()
+        if url.scheme() not in ("http", "https") or item.savePageFormat() != item.UnknownSaveFormat:
+            item.accept()
+            return
+        if hasattr(item, "downloadFileName"):
+            path = os.path.join(item.downloadDirectory(), item.downloadFileName())
+        else:
+            path = item.path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Not accepting the item cancels QtWebEngine's own download
+        self.fetch(url.toString(), _unique_path(path))
+
+    # ---------- Persistence ----------
+    def save_state(self):
+        if self.state_path is None:
+            return
+        finished = [d for d in self.downloads if d.state == "done"][-MAX_FINISHED:]
+        entries = [{"url": d.url, "path": d.path, "state": d.state, "error": d.error}
+                   for d in self.downloads if d.state != "canceled" and (d.state != "done" or d in finished)]
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print("Could not save downloads:", e)
+
+    def _load_state(self):
+        if self.state_path is None:
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        interrupted = []
+        for entry in entries:
+            download = self.fetch(entry["url"], entry["path"], start=False)
+            if entry["state"] == "done":
+                download.state = "done"
+                download.total = os.path.getsize(entry["path"]) if os.path.exists(entry["path"]) else 0
+            elif entry["state"] == "failed":
+                download.state = "failed"
+                download.error = entry.get("error", "")
+            elif entry["state"] == "running":
+                interrupted.append(download)
+        for download in interrupted:
+            download.start()
+
+
+class DownloadsWindow(QDialog):
+    """Lists downloads with progress and speed; pause, resume, cancel and the bandwidth cap."""
+    COLUMNS = ("File", "Progress", "Speed", "Status")
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.setWindowTitle("Downloads")
+        self.resize(700, 320)
+        self._last = {}  # download -> (received, time) at the previous refresh
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        for text, slot in (("Pause", lambda d: d.pause()), ("Resume", lambda d: d.start()),
+                           ("Cancel", lambda d: d.cancel())):
+            btn = QPushButton(text)
+            btn.clicked.connect(lambda _, s=slot: self._apply(s))
+            buttons.addWidget(btn)
+        clear_btn = QPushButton("Clear Finished")
+        clear_btn.clicked.connect(lambda: (self.manager.clear_finished(), self.refresh()))
+        buttons.addWidget(clear_btn)
+        buttons.addStretch()
+        buttons.addWidget(QLabel("Limit:"))
+        self.limit_box = QSpinBox()
+        self.limit_box.setRange(0, 1000000)
+        self.limit_box.setSuffix(" KB/s")
+        self.limit_box.setSpecialValueText("Unlimited")
+        self.limit_box.setValue(download_bandwidth_limit())
+        self.limit_box.valueChanged.connect(self.manager.set_bandwidth_limit)
+        buttons.addWidget(self.limit_box)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(SAMPLE_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+        manager.added.connect(lambda _: self.isVisible() and self.refresh())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def _apply(self, action):
+        for index in self.table.selectionModel().selectedRows():
+            if index.row() < len(self.manager.downloads):
+                action(self.manager.downloads[index.row()])
+        self.refresh()
+
+    def refresh(self):
+        now = time.monotonic()
+        downloads = self.manager.downloads
+        self.table.setRowCount(len(downloads))
+        for r, d in enumerate(downloads):
+            received = d.total if d.state == "done" else d.received
+            previous = self._last.get(d)
+            speed = ""
+            if d.state == "running" and previous and now > previous[1]:
+                speed = f"{(received - previous[0]) / (now - previous[1]) / 1024:.0f} KB/s"
+            self._last[d] = (received, now)
+            progress = f"{received / 1048576:.1f} MB"
+            if d.total:
+                progress += f" of {d.total / 1048576:.1f} MB ({received * 100 // d.total}%)"
+            status = d.state.capitalize() + (f": {d.error}" if d.error else "")
+            for c, value in enumerate((os.path.basename(d.path), progress, speed, status)):
+                item = QTableWidgetItem(value)
+                if c in (1, 2):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
@@ -0,0 +1,181 @@
+# hibernation.py
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl, QByteArray, QDataStream, QIODevice
+from metrics import process_rss_kb
+
+# --- Defaults ---
+IDLE_TIMEOUT = 30 * 60        # seconds a background tab may sit unused before it is discarded
+MEMORY_BUDGET_MB = 2048       # total renderer RSS allowed before LRU eviction kicks in
+BUDGET_CHECK_DELAY = 1000     # ms; coalesces bursts of loadFinished into one budget check
+
+
+class TabSnapshot:
+    """
+    Everything needed to rebuild a tab's web view: URL, title, serialized
+    QWebEngineHistory and scroll offset. A closed tab's snapshot also keeps
+    the id its "close" record got in the session journal.
+    """
+    __slots__ = ("url", "title", "history", "scroll", "closed_id")
+
+    def __init__(self, url, title, history=None, scroll=(0.0, 0.0), closed_id=None):
+        self.url = url
+        self.title = title
+        self.history = history
+        self.scroll = scroll
+        self.closed_id = closed_id
+
+    @classmethod
+    def capture(cls, web_view, title):
+        data = QByteArray()
+        stream = QDataStream(data, QIODevice.WriteOnly)
+        stream << web_view.history()
+        pos = web_view.page().scrollPosition()
+        return cls(web_view.url().toString(), title, data, (pos.x(), pos.y()))
+
+    def nbytes(self):
+        """Approximate memory held by the snapshot, dominated by the serialized history."""
+        history = self.history.size() if self.history is not None else 0
+        return history + len(self.url or "") + len(self.title or "")
+
+    def restore(self, web_view):
+        """Replays the saved history into web_view; this also starts loading the current entry."""
+        if self.scroll != (0.0, 0.0):
+            x, y = self.scroll
+
+            def scroll_back(ok):
+                web_view.loadFinished.disconnect(scroll_back)
+                if ok:
+                    web_view.page().runJavaScript(f"window.scrollTo({x}, {y});")
+
+            web_view.loadFinished.connect(scroll_back)
+
+        if self.history is not None and not self.history.isEmpty():
+            stream = QDataStream(self.history, QIODevice.ReadOnly)
+            stream >> web_view.history()
+        elif self.url:
+            web_view.load(QUrl(self.url))
+
+
+class TabHibernator(QObject):
+    """
+    Discards background tabs LRU-first once they have been idle longer than
+    idle_timeout, or while total renderer memory exceeds memory_budget_mb.
+    The current tab is never discarded; discarded tabs are rebuilt when shown.
+    """
+    def __init__(self, browser, idle_timeout=IDLE_TIMEOUT, memory_budget_mb=MEMORY_BUDGET_MB):
+        super().__init__(browser)
+        self.browser = browser
+        self.idle_timeout = idle_timeout
+        self.memory_budget_mb = memory_budget_mb
+        self.discard_count = 0
+        self._current = None
+
+        # Both timers are single shots armed only when there is work pending,
+        # so an idle browser with nothing to evict never wakes up.
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self.sweep)
+
+        self._budget_timer = QTimer(self)
+        self._budget_timer.setSingleShot(True)
+        self._budget_timer.setInterval(BUDGET_CHECK_DELAY)
+        self._budget_timer.timeout.connect(self.enforce_budget)
+
+        browser.tabs.currentChanged.connect(self.on_current_changed)
+
+    # ---------- Tracking ----------
+    def on_current_changed(self, index):
+        now = time.monotonic()
+        if self._current is not None and self.browser.tabs.indexOf(self._current) != -1:
+            self._current.last_active = now
+        tab = self.browser.tabs.widget(index)
+        self._current = tab
+        if tab is not None:
+            tab.last_active = now
+            if self.browser.is_discarded(tab):
+                self.browser.web_view(tab)  # rebuilds it as a foreground load
+        self._reschedule()
+        self.schedule_budget_check()
+
+    def schedule_budget_check(self):
+        if self.memory_budget_mb and not self._budget_timer.isActive():
+            self._budget_timer.start()
+
+    def _background_tabs(self):
+        current = self.browser.tabs.currentWidget()
+        for i in range(self.browser.tabs.count()):
+            tab = self.browser.tabs.widget(i)
+            if tab is not current and not self.browser.is_discarded(tab):
+                yield tab
+
+    def _lru_candidates(self):
+        tabs = [t for t in self._background_tabs() if not self._pinned(t)]
+        return sorted(tabs, key=lambda t: getattr(t, "last_active", 0.0))
+
+    def _pinned(self, tab):
+        # Discarding a tab that is playing audio would cut the sound off
+        web_view = self.browser.web_view(tab, restore=False)
+        return web_view is not None and web_view.page().recentlyAudible()
+
+    def _reschedule(self):
+        if not self.idle_timeout:
+            return
+        stamps = [getattr(t, "last_active", 0.0) for t in self._lru_candidates()]
+        if not stamps:
+            self._idle_timer.stop()
+            return
+        due = min(stamps) + self.idle_timeout - time.monotonic()
+        self._idle_timer.start(max(0, int(due * 1000)))
+
+    # ---------- Eviction ----------
+    def sweep(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for tab in self._lru_candidates():
+            if getattr(tab, "last_active", 0.0) <= cutoff:
+                self._discard(tab)
+        self._reschedule()
+
+    def renderer_memory(self):
+        """
+        Returns ({pid: rss_kb}, {pid: [tabs]}) for live tabs. Tabs on the same site
+        may share a renderer, so memory is accounted per process, not per tab.
+        """
+        rss, owners = {}, {}
+        for i in range(self.browser.tabs.count()):
+            tab = self.browser.tabs.widget(i)
+            web_view = self.browser.web_view(tab, restore=False)
+            if web_view is None:
+                continue
+            pid = web_view.page().renderProcessPid()
+            if pid <= 0:
+                continue
+            if pid not in rss:
+                rss[pid] = process_rss_kb(pid)
+            owners.setdefault(pid, []).append(tab)
+        return rss, owners
+
+    def enforce_budget(self):
+        if not self.memory_budget_mb:
+            return
+        rss, owners = self.renderer_memory()
+        if any(v is None for v in rss.values()):
+            return  # no per-process memory info on this platform
+        budget_kb = self.memory_budget_mb * 1024
+        total = sum(rss.values())
+        for tab in self._lru_candidates():
+            if total <= budget_kb:
+                break
+            web_view = self.browser.web_view(tab, restore=False)
+            pid = web_view.page().renderProcessPid()
+            self._discard(tab)
+            sharers = owners.get(pid, [])
+            if tab in sharers:
+                sharers.remove(tab)
+            if not sharers and pid in rss:
+                # The renderer exits once its last tab is gone
+                total -= rss.pop(pid)
+        self._reschedule()
+
+    def _discard(self, tab):
+        self.browser.discard_tab(tab)
+        self.discard_count += 1
@@ -0,0 +1,177 @@
+# history.py
+import queue
+import sqlite3
+import threading
+import time
+
+MAX_AGE_DAYS = 90
+MAX_URLS = 1_000_000
+BATCH_SIZE = 1000
+EXPIRE_EVERY = 200  # batches between retention passes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id          INTEGER PRIMARY KEY,
+    url         TEXT NOT NULL UNIQUE,
+    title       TEXT NOT NULL DEFAULT '',
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    last_visit  REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_last_visit ON urls(last_visit);
+CREATE TABLE IF NOT EXISTS visits (
+    id         INTEGER PRIMARY KEY,
+    url_id     INTEGER NOT NULL,
+    visit_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_time ON visits(visit_time);
+CREATE INDEX IF NOT EXISTS visits_url ON visits(url_id);
+"""
+
+_UPSERT = """
+INSERT INTO urls (url, title, visit_count, last_visit) VALUES (?, ?, 1, ?)
+ON CONFLICT(url) DO UPDATE SET
+    visit_count = visit_count + 1,
+    last_visit = MAX(urls.last_visit, excluded.last_visit),
+    title = CASE WHEN excluded.title != '' THEN excluded.title ELSE urls.title END
+"""
+
+
+class HistoryEntry:
+    __slots__ = ("url", "title", "visit_count", "last_visit")
+
+    def __init__(self, url, title, visit_count, last_visit):
+        self.url = url
+        self.title = title
+        self.visit_count = visit_count
+        self.last_visit = last_visit
+
+
+class HistoryStore:
+    """
+    SQLite-backed browsing history. Writes are queued and committed in batches by
+    a background thread, so recording a visit never touches the disk on the
+    caller's thread. Reads use their own connection (WAL mode lets them run
+    alongside the writer) and must stay on the thread that created the store.
+    """
+    def __init__(self, path, max_age_days=MAX_AGE_DAYS, max_urls=MAX_URLS):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_urls = max_urls
+        self.listeners = []  # called as listener(url, title, when) on every recorded visit
+        self._queue = queue.Queue()
+
+        self._writer_db = sqlite3.connect(path, check_same_thread=False)
+        self._writer_db.execute("PRAGMA journal_mode=WAL")
+        self._writer_db.execute("PRAGMA synchronous=NORMAL")
+        self._writer_db.executescript(SCHEMA)
+        self._writer_db.commit()
+        self._reader_db = sqlite3.connect(path)
+
+        self._thread = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- Writes (any thread, non-blocking) ----------
+    def record_visit(self, url, title="", when=None):
+        when = time.time() if when is None else when
+        self._queue.put(("visit", url, title, when))
+        for listener in self.listeners:
+            listener(url, title, when)
+
+    def set_title(self, url, title):
+        if title:
+            self._queue.put(("title", url, title, None))
+
+    def flush(self):
+        """Blocks until every queued write has been committed; a closed store has nothing left to wait for."""
+        if not self._thread.is_alive():
+            return
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._reader_db.close()
+
+    def _write_loop(self):
+        db = self._writer_db
+        batches = 0
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            try:
+                with db:
+                    for entry in batch:
+                        if entry is not None:
+                            self._apply(db, *entry)
+                batches += 1
+                if batches % EXPIRE_EVERY == 0 or any(e and e[0] == "expire" for e in batch):
+                    self._expire(db)
+            except sqlite3.Error as e:
+                print("History write failed:", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is None:
+                db.close()
+                return
+
+    def _apply(self, db, kind, url, title, when):
+        if kind == "visit":
+            db.execute(_UPSERT, (url, title, when))
+            db.execute("INSERT INTO visits (url_id, visit_time) "
+                       "SELECT id, ? FROM urls WHERE url = ?", (when, url))
+        elif kind == "title":
+            db.execute("UPDATE urls SET title = ? WHERE url = ?", (title, url))
+
+    def expire(self):
+        """Applies the retention limits now instead of waiting for the writer's next pass."""
+        self._queue.put(("expire", None, None, None))
+
+    def _expire(self, db):
+        with db:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                db.execute("DELETE FROM visits WHERE visit_time < ?", (cutoff,))
+                db.execute("DELETE FROM urls WHERE last_visit < ?", (cutoff,))
+            if self.max_urls:
+                (count,) = db.execute("SELECT COUNT(*) FROM urls").fetchone()
+                if count > self.max_urls:
+                    db.execute("DELETE FROM urls WHERE id IN "
+                               "(SELECT id FROM urls ORDER BY last_visit LIMIT ?)",
+                               (count - self.max_urls,))
+                    db.execute("DELETE FROM visits WHERE url_id NOT IN (SELECT id FROM urls)")
+
+    # ---------- Reads (creating thread only) ----------
+    def lookup(self, url):
+        row = self._reader_db.execute(
+            "SELECT url, title, visit_count, last_visit FROM urls WHERE url = ?", (url,)).fetchone()
+        return HistoryEntry(*row) if row else None
+
+    def __contains__(self, url):
+        return self._reader_db.execute(
+            "SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        return self._reader_db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def recent(self, limit=100):
+        rows = self._reader_db.execute(
+            "SELECT url, title, visit_count, last_visit FROM urls "
+            "ORDER BY last_visit DESC LIMIT ?", (limit,))
+        return [HistoryEntry(*row) for row in rows]
+
+    def visits_between(self, start, end):
+        """(url, visit_time) pairs in [start, end), newest first; served by the visit_time index."""
+        return self._reader_db.execute(
+            "SELECT urls.url, visits.visit_time FROM visits JOIN urls ON urls.id = visits.url_id "
+            "WHERE visits.visit_time >= ? AND visits.visit_time < ? "
+            "ORDER BY visits.visit_time DESC", (start, end)).fetchall()
@@ -0,0 +1,89 @@
+# loadscheduler.py
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QTimer
+from metrics import LatencyStats
+
+MAX_CONCURRENT_LOADS = 3
+LOAD_TIMEOUT = 30000  # ms; a load that never reports loadFinished stops holding a slot
+
+
+class LoadScheduler(QObject):
+    """
+    Gatekeeper for tab navigations. At most max_concurrent loads run at once;
+    the rest wait in FIFO order and start as running ones finish. The current
+    tab never waits: its loads start immediately, and a queued tab that
+    becomes current jumps out of the queue.
+    """
+    def __init__(self, browser, max_concurrent=MAX_CONCURRENT_LOADS):
+        super().__init__(browser)
+        self.browser = browser
+        self.max_concurrent = max_concurrent
+        self.wait_ms = LatencyStats()   # time queued loads spent waiting for a slot
+        self.started = 0
+        self.max_queue_depth = 0
+        self._waiting = OrderedDict()   # tab -> (navigate, queued_at)
+        self._running = {}              # tab -> started_at
+        browser.tabs.currentChanged.connect(self.promote)
+
+    def request(self, tab, navigate, foreground=False):
+        """
+        Runs navigate() (which starts the tab's load) now if the tab is in front or
+        a slot is free; otherwise queues it. A newer request for a queued tab
+        replaces the older one but keeps its place. navigate() returns False when
+        there turned out to be nothing to load; then it holds no slot.
+        """
+        if foreground or tab is self.browser.tabs.currentWidget() or len(self._running) < self.max_concurrent:
+            self._waiting.pop(tab, None)
+            self._start(tab, navigate)
+            return
+        queued_at = self._waiting[tab][1] if tab in self._waiting else time.monotonic()
+        self._waiting[tab] = (navigate, queued_at)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+
+    def promote(self, index):
+        tab = self.browser.tabs.widget(index)
+        if tab in self._waiting:
+            navigate, queued_at = self._waiting.pop(tab)
+            self.wait_ms.add((time.monotonic() - queued_at) * 1000)
+            self._start(tab, navigate)
+
+    def finished(self, tab):
+        if self._running.pop(tab, None) is not None:
+            self._pump()
+
+    def forget(self, tab):
+        """Drops a tab that was closed or discarded, freeing its slot."""
+        self._waiting.pop(tab, None)
+        self.finished(tab)
+
+    def stats(self):
+        return {
+            "running": len(self._running),
+            "queued": len(self._waiting),
+            "max_queue_depth": self.max_queue_depth,
+            "started": self.started,
+            "wait_ms": self.wait_ms.summary(),
+        }
+
+    def _start(self, tab, navigate):
+        started_at = time.monotonic()
+        self._running[tab] = started_at
+        if navigate() is False:
+            # E.g. a preload for a tab that became current and loaded in the meantime
+            self.finished(tab)
+            return
+        self.started += 1
+        QTimer.singleShot(LOAD_TIMEOUT, lambda: self._expire(tab, started_at))
+
+    def _expire(self, tab, started_at):
+        if self._running.get(tab) == started_at:
+            self.finished(tab)
+
+    def _pump(self):
+        while self._waiting and len(self._running) < self.max_concurrent:
+            tab, (navigate, queued_at) = self._waiting.popitem(last=False)
+            if self.browser.tabs.indexOf(tab) == -1:
+                continue
+            self.wait_ms.add((time.monotonic() - queued_at) * 1000)
+            self._start(tab, navigate)
@@ -1,18 +1,47 @@
 import sys
 import os
+import time
+_START = time.perf_counter()  # before the Qt imports, so they show up in --profile-startup
+
+import argparse
+from startup import StartupProfiler
+from storage import smooth_scroll_enabled, process_model_flags, PROCESS_MODELS
 from PyQt5.QtWidgets import QApplication, QAction
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt, QTimer
 from ui import Browser
+from webprofile import browser_profile
 from shortcuts import Shortcuts
-from updater import Updater  # ← new import
 
 # --- App metadata ---
 APP_VERSION = "1.0.2"  # bump this each release
 UPDATE_FEED = "https://therealkushi.github.io/Cobalt-Browser/updates.json"
 APP_ID = "cobalt.browser.1.0.2"  # Windows taskbar AppUserModelID
+UPDATE_START_FALLBACK = 60000  # ms; start update checks anyway if no page ever finishes loading
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="cobalt_browser", add_help=False)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a timed breakdown of startup phases once the first page loads")
+    parser.add_argument("--profile-startup-json", metavar="PATH",
+                        help="also write the breakdown as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit as soon as the first page has loaded (for benchmarks)")
+    parser.add_argument("--process-model", choices=PROCESS_MODELS,
+                        help="renderer process model for this run (default: the process_model setting)")
+    parser.add_argument("--renderer-process-limit", type=int, metavar="N",
+                        help="cap on renderer processes for this run, 0 for none "
+                             "(default: the renderer_process_limit setting)")
+    # Whatever we don't recognize is left for Qt
+    return parser.parse_known_args(argv[1:])
+
 
 if __name__ == "__main__":
+    args, qt_args = parse_args(sys.argv)
+    profiler = StartupProfiler(_START, enabled=args.profile_startup or bool(args.profile_startup_json))
+    profiler.mark("imports")
+
     # Get absolute path to icon (works for PyInstaller too)
     if getattr(sys, 'frozen', False):
         # If running as a bundled exe
@@ -21,8 +50,21 @@ if __name__ == "__main__":
         base_path = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_path, "assets", "icon.ico")
 
-    app = QApplication(sys.argv)
+    # Chromium reads its switches once, before QtWebEngine starts
+    chromium_flags = []
+    if smooth_scroll_enabled():
+        chromium_flags.append("--enable-smooth-scrolling")  # animated wheel scrolling, off the main thread
+    chromium_flags += process_model_flags(args.process_model, args.renderer_process_limit)
+    if chromium_flags:
+        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(
+            filter(None, [os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "")] + chromium_flags))
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setWindowIcon(QIcon(icon_path))
+    profiler.mark("qapplication")
+
+    browser_profile()  # brings up QtWebEngine and opens the on-disk cache and cookie store
+    profiler.mark("webengine_init")
 
     browser = Browser()
     browser.setWindowIcon(QIcon(icon_path))
@@ -36,17 +78,46 @@ if __name__ == "__main__":
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(APP_ID)
 
     # --- Updater setup ---
-    updater = Updater(browser, APP_VERSION, UPDATE_FEED, app_name="Cobalt Browser")
+    # Created on first use: nothing update-related runs before the first page is up
+    updater = None
+
+    def get_updater():
+        global updater
+        if updater is None:
+            from updater import Updater, UpdateScheduler
+            updater = Updater(browser, APP_VERSION, UPDATE_FEED, app_name="Cobalt Browser",
+                              downloads=browser.download_manager())
+            updater.scheduler = UpdateScheduler(updater)
+        return updater
 
     # Add Help > Check for Updates...
     help_menu = browser.menu.addMenu("Help")
     check_action = QAction("Check for Updates…", browser)
-    check_action.triggered.connect(lambda: updater.check(silent=False))
+    check_action.triggered.connect(lambda: get_updater().check(silent=False))
     help_menu.addAction(check_action)
 
-    # Auto-check a few seconds after startup
-    QTimer.singleShot(3000, lambda: updater.check(silent=True))
-
     Shortcuts(browser)
+    profiler.mark("window_created")
+
+    # --- Startup profiling ---
+    def on_first_page():
+        profiler.mark("first_page_load")
+        if profiler.enabled:
+            profiler.report()
+            if args.profile_startup_json == "-":
+                print(profiler.to_json())
+            elif args.profile_startup_json:
+                with open(args.profile_startup_json, "w", encoding="utf-8") as f:
+                    f.write(profiler.to_json())
+        if args.exit_after_startup:
+            app.quit()
+
+    browser.first_paint.connect(lambda: profiler.mark("first_paint"))
+    browser.first_page_loaded.connect(on_first_page)
+
+    # Periodic background checks, starting once the first page has loaded
+    browser.first_page_loaded.connect(lambda: get_updater().scheduler.start())
+    QTimer.singleShot(UPDATE_START_FALLBACK, lambda: get_updater().scheduler.start())  # start() ignores the second call
+
     browser.show()
     sys.exit(app.exec_())
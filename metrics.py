@@ -0,0 +1,63 @@
+# metrics.py
+import time
+from collections import deque
+
+
+class RateCounter:
+    """
+    Counts events and reports how many happened in the last second.
+    Timestamps are only recorded when an event fires, so an idle counter costs nothing.
+    """
+    def __init__(self, window=1.0):
+        self.window = window
+        self.total = 0
+        self._stamps = deque()
+
+    def tick(self):
+        now = time.monotonic()
+        self.total += 1
+        self._stamps.append(now)
+        self._trim(now)
+
+    def per_second(self):
+        self._trim(time.monotonic())
+        return len(self._stamps) / self.window
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        while self._stamps and self._stamps[0] < cutoff:
+            self._stamps.popleft()
+
+
+class LatencyStats:
+    """Keeps the most recent latency samples (ms) and summarizes them as percentiles."""
+    def __init__(self, max_samples=256):
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, ms):
+        self.samples.append(ms)
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+        return {
+            "count": len(ordered),
+            "last": round(self.samples[-1], 2),
+            "p50": pick(0.50),
+            "p95": pick(0.95),
+            "max": round(ordered[-1], 2),
+        }
+
+
+def process_rss_kb(pid):
+    """Resident set size of pid in KiB from /proc, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
@@ -0,0 +1,173 @@
+# omnibox.py
+import heapq
+import time
+from bisect import bisect_left, insort
+
+MAX_RESULTS = 8
+SCAN_LIMIT = 5000          # prefix matches examined per query before ranking
+BOOKMARK_BONUS = 1.4
+CONFIDENT_VISITS = 5       # visits after which repeat use adds nothing more to top_match's confidence
+
+# Frecency recency weights: (max age in days, weight), as in Firefox's Places
+RECENCY_BUCKETS = ((4, 100), (14, 70), (31, 50), (90, 30))
+OLD_VISIT_WEIGHT = 10
+
+
+def _strip_url(url):
+    """'https://www.Example.com/a' → 'example.com/a', the form people actually type."""
+    text = url.lower()
+    for prefix in ("https://", "http://", "file://"):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    return text[4:] if text.startswith("www.") else text
+
+
+class IndexEntry:
+    __slots__ = ("url", "title", "visit_count", "last_visit", "bookmarked", "keys")
+
+    def __init__(self, url):
+        self.url = url
+        self.title = ""
+        self.visit_count = 0
+        self.last_visit = 0.0
+        self.bookmarked = False
+        self.keys = ()
+
+    def frecency(self, now):
+        age_days = (now - self.last_visit) / 86400
+        weight = OLD_VISIT_WEIGHT
+        for max_age, bucket_weight in RECENCY_BUCKETS:
+            if age_days <= max_age:
+                weight = bucket_weight
+                break
+        score = max(self.visit_count, 1) * weight
+        return score * BOOKMARK_BONUS if self.bookmarked else score
+
+
+class PrefixIndex:
+    """
+    In-memory completion index over history and bookmarks. Keys (stripped URL,
+    hostname and title words) live in one sorted list, so a prefix lookup is a
+    binary search plus a short scan; matches are ranked by frecency. Updates are
+    incremental: only the keys of the entry that changed are touched.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._keys = []  # sorted (key, url)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- Updates ----------
+    def record_visit(self, url, title="", when=None):
+        entry = self._entry(url)
+        entry.visit_count += 1
+        entry.last_visit = max(entry.last_visit, time.time() if when is None else when)
+        if title:
+            entry.title = title
+        self._reindex(entry)
+
+    def set_title(self, url, title):
+        entry = self._entries.get(url)
+        if entry is not None and title and title != entry.title:
+            entry.title = title
+            self._reindex(entry)
+
+    def add_history_entry(self, url, title, visit_count, last_visit):
+        entry = self._entry(url)
+        entry.title = title or entry.title
+        entry.visit_count = max(entry.visit_count, visit_count)
+        entry.last_visit = max(entry.last_visit, last_visit)
+        self._reindex(entry)
+
+    def load(self, history_entries, bookmarks=()):
+        """
+        Bulk-seeds the index (e.g. from HistoryStore.recent() and BookmarkStore.urls())
+        with a single sort. bookmarks are (url, title) pairs. Counts already in the
+        index (visits recorded this session) are merged, never lowered.
+        """
+        for item in history_entries:
+            entry = self._entry(item.url)
+            entry.title = item.title or entry.title
+            entry.visit_count = max(entry.visit_count, item.visit_count)
+            entry.last_visit = max(entry.last_visit, item.last_visit)
+        for url, title in bookmarks:
+            entry = self._entry(url)
+            entry.bookmarked = True
+            entry.title = entry.title or title
+        for entry in self._entries.values():
+            entry.keys = self._keys_for(entry)
+        self._keys = sorted((key, url) for url, e in self._entries.items() for key in e.keys)
+
+    def add_bookmark(self, url, title):
+        entry = self._entry(url)
+        entry.bookmarked = True
+        entry.title = entry.title or title
+        self._reindex(entry)
+
+    def _entry(self, url):
+        entry = self._entries.get(url)
+        if entry is None:
+            entry = self._entries[url] = IndexEntry(url)
+        return entry
+
+    def _keys_for(self, entry):
+        stripped = _strip_url(entry.url)
+        host = stripped.split("/", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+        keys = {stripped, host} if host else {stripped}
+        keys.update(word for word in entry.title.lower().split() if len(word) > 1)
+        return tuple(sorted(keys))
+
+    def _reindex(self, entry):
+        keys = self._keys_for(entry)
+        if keys == entry.keys:
+            return
+
+        for key in entry.keys:
+            pos = bisect_left(self._keys, (key, entry.url))
+            if pos < len(self._keys) and self._keys[pos] == (key, entry.url):
+                del self._keys[pos]
+        for key in keys:
+            insort(self._keys, (key, entry.url))
+        entry.keys = keys
+
+    # ---------- Queries ----------
+    def query(self, text, limit=MAX_RESULTS):
+        now = time.time()
+        best = heapq.nlargest(limit, self._matches(text), key=lambda e: e.frecency(now))
+        return [entry.url for entry in best]
+
+    def top_match(self, text):
+        """
+        The best match for text and how sure we are it's where the user is going,
+        from 0 to 1: half for text being a prefix of the URL itself (not just a
+        title word), up to 0.3 for repeat visits and up to 0.2 for how far it
+        outranks the runner-up.
+        """
+        now = time.time()
+        best = heapq.nlargest(2, self._matches(text), key=lambda e: e.frecency(now))
+        if not best:
+            return None, 0.0
+        top = best[0]
+        confidence = 0.5 if _strip_url(top.url).startswith(_strip_url(text.strip())) else 0.1
+        confidence += 0.3 * min(1.0, top.visit_count / CONFIDENT_VISITS)
+        top_score = top.frecency(now)
+        runner_up = best[1].frecency(now) if len(best) > 1 else 0.0
+        confidence += 0.2 * top_score / (top_score + runner_up)
+        return top.url, confidence
+
+    def _matches(self, text):
+        prefix = _strip_url(text.strip())
+        if not prefix:
+            return []
+        matches = {}
+        pos = bisect_left(self._keys, (prefix,))
+        end = min(len(self._keys), pos + SCAN_LIMIT)
+        while pos < end:
+            key, url = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            matches[url] = self._entries[url]
+            pos += 1
+        return matches.values()
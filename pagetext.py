@@ -0,0 +1,247 @@
+# pagetext.py
+import hashlib
+import math
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+MAX_BYTES = 256 * 1024 * 1024   # total indexed text before the least recently seen pages are evicted
+MAX_PAGE_CHARS = 200_000        # longer pages are indexed up to this many characters
+EVICT_TO = 0.9                  # eviction trims down to this fraction of max_bytes
+BATCH_SIZE = 100                # pages per write transaction
+RESULTS = 20
+BM25_K1 = 1.2                   # the FTS4 fallback's ranking uses the same constants as FTS5's bm25()
+BM25_B = 0.75
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id        INTEGER PRIMARY KEY,
+    hash      TEXT NOT NULL UNIQUE,
+    size      INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_last_seen ON documents(last_seen);
+CREATE TABLE IF NOT EXISTS pages (
+    id      INTEGER PRIMARY KEY,
+    url     TEXT NOT NULL UNIQUE,
+    title   TEXT NOT NULL DEFAULT '',
+    doc_id  INTEGER NOT NULL,
+    visited REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_doc ON pages(doc_id);
+"""
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fts_query(text):
+    """User input → an FTS MATCH expression: every word must appear, the last one as a prefix."""
+    words = _WORD_RE.findall(text)
+    if not words:
+        return None
+    terms = ['"%s"' % w for w in words[:-1]] + ['"%s"*' % words[-1]]
+    return " ".join(terms)
+
+
+def _bm25(matchinfo, *weights):
+    """
+    BM25 over an FTS4 matchinfo(..., 'pcnalx') blob, higher is better; weights
+    are per column, as for FTS5's bm25(). FTS4 has no ranking function of its own.
+    """
+    info = memoryview(matchinfo).cast("I")
+    phrases, columns, rows = info[0], info[1], info[2]
+    avg_lengths, lengths, hits = info[3:3 + columns], info[3 + columns:3 + 2 * columns], info[3 + 2 * columns:]
+    score = 0.0
+    for p in range(phrases):
+        for c in range(columns):
+            weight = weights[c] if c < len(weights) else 1.0
+            tf, _, docs = hits[3 * (p * columns + c):3 * (p * columns + c) + 3]
+            if not tf or not weight:
+                continue
+            idf = max(math.log((rows - docs + 0.5) / (docs + 0.5)), 1e-6)
+            norm = 1 - BM25_B + BM25_B * lengths[c] / (avg_lengths[c] or 1)
+            score += weight * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+    return score
+
+
+class PageHit:
+    __slots__ = ("url", "title", "snippet", "visited")
+
+    def __init__(self, url, title, snippet, visited):
+        self.url = url
+        self.title = title
+        self.snippet = snippet
+        self.visited = visited
+
+
+class PageTextIndex:
+    """
+    Full-text index of visited pages' text in SQLite FTS5 (FTS4 where FTS5 isn't
+    compiled in). Like HistoryStore, writes are queued and done by a background
+    thread, including normalizing and hashing the text, so the UI thread only
+    hands over a string. Identical text seen under several URLs is stored once.
+    Reads use a separate connection on the creating thread. The indexed size is
+    kept as a running total, so eviction never has to sum the table.
+    """
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue = queue.Queue()
+
+        self._writer_db = sqlite3.connect(path, check_same_thread=False)
+        self._writer_db.execute("PRAGMA journal_mode=WAL")
+        self._writer_db.execute("PRAGMA synchronous=NORMAL")
+        self._writer_db.executescript(SCHEMA)
+        self.fts_version = self._create_fts(self._writer_db)
+        self._writer_db.commit()
+        self._bytes = self._total_size(self._writer_db)
+        self._reader_db = sqlite3.connect(path)
+        if self.fts_version == 4:
+            self._reader_db.create_function("fts4_bm25", -1, _bm25, deterministic=True)
+
+        self._thread = threading.Thread(target=self._write_loop, name="page-text-writer", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _create_fts(db):
+        existing = db.execute("SELECT sql FROM sqlite_master WHERE name = 'page_text'").fetchone()
+        if existing:
+            return 5 if "fts5" in existing[0].lower() else 4
+        try:
+            db.execute("CREATE VIRTUAL TABLE page_text USING fts5(title, body, "
+                       "tokenize = 'unicode61 remove_diacritics 2')")
+            return 5
+        except sqlite3.OperationalError:
+            db.execute("CREATE VIRTUAL TABLE page_text USING fts4(title, body, tokenize=unicode61)")
+            return 4
+
+    # ---------- Writes (any thread, non-blocking) ----------
+    def add_page(self, url, title, text, when=None):
+        self._queue.put((url, title or "", text or "", time.time() if when is None else when))
+
+    def flush(self):
+        """Blocks until every queued page has been indexed; a closed index has nothing left to wait for."""
+        if not self._thread.is_alive():
+            return
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._reader_db.close()
+
+    def _write_loop(self):
+        db = self._writer_db
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            try:
+                with db:
+                    for entry in batch:
+                        if entry is not None:
+                            self._index(db, *entry)
+                    self._evict(db)
+            except sqlite3.Error as e:
+                print("Page text indexing failed:", e)
+                self._bytes = self._total_size(db)  # the batch was rolled back
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                db.close()
+                return
+
+    def _index(self, db, url, title, text, when):
+        text = _SPACE_RE.sub(" ", text).strip()[:MAX_PAGE_CHARS]
+        if not text:
+            return
+        digest = hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+        row = db.execute("SELECT id FROM documents WHERE hash = ?", (digest,)).fetchone()
+        if row:
+            doc_id = row[0]
+            db.execute("UPDATE documents SET last_seen = ? WHERE id = ?", (when, doc_id))
+        else:
+            doc_id = db.execute("INSERT INTO documents (hash, size, last_seen) VALUES (?, ?, ?)",
+                                (digest, len(text), when)).lastrowid
+            db.execute("INSERT INTO page_text (rowid, title, body) VALUES (?, ?, ?)", (doc_id, title, text))
+            self._bytes += len(text)
+
+        previous = db.execute("SELECT doc_id FROM pages WHERE url = ?", (url,)).fetchone()
+        db.execute("INSERT INTO pages (url, title, doc_id, visited) VALUES (?, ?, ?, ?) "
+                   "ON CONFLICT(url) DO UPDATE SET title = excluded.title, doc_id = excluded.doc_id, "
+                   "visited = excluded.visited", (url, title, doc_id, when))
+        if previous and previous[0] != doc_id:
+            self._drop_orphan(db, previous[0])
+
+    def _drop_orphan(self, db, doc_id):
+        if db.execute("SELECT 1 FROM pages WHERE doc_id = ? LIMIT 1", (doc_id,)).fetchone() is None:
+            (size,) = db.execute("SELECT size FROM documents WHERE id = ?", (doc_id,)).fetchone()
+            db.execute("DELETE FROM page_text WHERE rowid = ?", (doc_id,))
+            db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            self._bytes -= size
+
+    @staticmethod
+    def _total_size(db):
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+
+    def _evict(self, db):
+        if not self.max_bytes or self._bytes <= self.max_bytes:
+            return
+        target = self._bytes - int(self.max_bytes * EVICT_TO)
+        freed, doomed = 0, []
+        for doc_id, size in db.execute("SELECT id, size FROM documents ORDER BY last_seen"):
+            doomed.append((doc_id,))
+            freed += size
+            if freed >= target:
+                break
+        db.executemany("DELETE FROM page_text WHERE rowid = ?", doomed)
+        db.executemany("DELETE FROM pages WHERE doc_id = ?", doomed)
+        db.executemany("DELETE FROM documents WHERE id = ?", doomed)
+        self._bytes -= freed
+
+    # ---------- Reads (creating thread only) ----------
+    def search(self, text, limit=RESULTS):
+        """
+        Best matches for text, ranked by BM25 (title weighted up) with a highlighted
+        snippet. FTS5 ranks natively; under FTS4 _bm25() does, over matchinfo().
+        """
+        match = fts_query(text)
+        if match is None:
+            return []
+        if self.fts_version == 5:
+            # FTS5's own rank ordering only runs snippet() for the rows it returns
+            sql = ("SELECT rowid, snippet(page_text, 1, '[', ']', '…', 16) FROM page_text "
+                   "WHERE page_text MATCH ? AND rank MATCH 'bm25(4.0, 1.0)' ORDER BY rank LIMIT ?")
+        else:
+            sql = ("SELECT rowid, snippet(page_text, '[', ']', '…', 1, 16) FROM page_text "
+                   "WHERE page_text MATCH ? ORDER BY fts4_bm25(matchinfo(page_text, 'pcnalx'), 4.0, 1.0) DESC "
+                   "LIMIT ?")
+        try:
+            rows = self._reader_db.execute(sql, (match, limit)).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        hits = []
+        for doc_id, snippet in rows:
+            page = self._reader_db.execute(
+                "SELECT url, title, visited FROM pages WHERE doc_id = ? ORDER BY visited DESC LIMIT 1",
+                (doc_id,)).fetchone()
+            if page:
+                hits.append(PageHit(page[0], page[1], snippet, page[2]))
+        return hits
+
+    def __len__(self):
+        return self._reader_db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def size(self):
+        """Bytes of page text currently indexed (the writer's running total)."""
+        return self._bytes
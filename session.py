@@ -0,0 +1,133 @@
+# session.py
+import json
+import os
+
+COMPACT_EVERY = 500        # journal records between snapshot rewrites
+MAX_CLOSED_TABS = 25
+
+
+class SessionJournal:
+    """
+    Persists open tabs as a snapshot plus an append-only journal of small
+    records (open/close/reopen/move/navigate/title/activate). Every record is applied
+    to an in-memory model as well, and the journal is folded into a fresh
+    snapshot every COMPACT_EVERY records.
+
+    Replaying a record is idempotent, so a crash between writing the new
+    snapshot and truncating the journal is harmless, and a torn last line
+    (crash mid-write) is simply ignored. Closed tabs carry an id of their own
+    for this: "reopen" removes exactly the entry it names, however often it
+    is replayed.
+    """
+    def __init__(self, directory):
+        self.snapshot_path = os.path.join(directory, "session.json")
+        self.journal_path = os.path.join(directory, "session.journal")
+        self.tabs = []          # [{"id", "url", "title"}] in tab order
+        self.active = None
+        self.closed = []        # [(url, title, closed_id)], most recent last
+        self._next_closed_id = 1
+        self._pending = 0
+        torn = self._load()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if torn:
+            self.compact()  # don't append after a half-written line
+
+    # ---------- Loading ----------
+    def _load(self):
+        """Reads snapshot + journal; returns True if the journal ended in a torn record."""
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.tabs = state.get("tabs", [])
+            self.active = state.get("active")
+            # Snapshots from before closed ids were recorded have (url, title) only
+            self.closed = [(c[0], c[1], c[2] if len(c) > 2 else None) for c in state.get("closed", [])]
+            self._next_closed_id = max([c[2] + 1 for c in self.closed if c[2] is not None] + [1])
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        return True  # torn write from a crash; everything before it is good
+                    self._apply(record)
+                    self._pending += 1
+        except OSError:
+            pass
+        return False
+
+    # ---------- Recording ----------
+    def record(self, op, **fields):
+        if self._journal.closed:
+            return  # late signals while the window is being torn down
+        record = dict(fields, op=op)
+        self._apply(record)
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        self._pending += 1
+        if self._pending >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        state = {"tabs": self.tabs, "active": self.active, "closed": self.closed}
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self._pending = 0
+
+    def new_closed_id(self):
+        """An id for the next "close" record, unique within this session file."""
+        closed_id = self._next_closed_id
+        self._next_closed_id += 1
+        return closed_id
+
+    def close(self):
+        self.compact()
+        self._journal.close()
+
+    def _find(self, tab_id):
+        for i, tab in enumerate(self.tabs):
+            if tab["id"] == tab_id:
+                return i
+        return -1
+
+    def _apply(self, record):
+        op = record.get("op")
+        i = self._find(record.get("id"))
+        if op == "open":
+            tab = {"id": record["id"], "url": record.get("url", ""), "title": record.get("title", "")}
+            if i != -1:
+                self.tabs[i] = tab
+            else:
+                self.tabs.insert(min(record.get("index", len(self.tabs)), len(self.tabs)), tab)
+        elif op == "close" and i != -1:
+            tab = self.tabs.pop(i)
+            closed_id = record.get("closed_id")
+            if closed_id is not None:
+                self._next_closed_id = max(self._next_closed_id, closed_id + 1)
+            if tab["url"] and (closed_id is None or all(c[2] != closed_id for c in self.closed)):
+                self.closed = (self.closed + [(tab["url"], tab["title"], closed_id)])[-MAX_CLOSED_TABS:]
+        elif op == "reopen" and "closed_id" in record:
+            # That closed entry went back into a tab; one already gone is left alone
+            self.closed = [c for c in self.closed if c[2] != record["closed_id"]]
+        elif op == "reopen":
+            # Journals from before closed ids: the most recent closed entry for this URL
+            for j in range(len(self.closed) - 1, -1, -1):
+                if self.closed[j][0] == record.get("url"):
+                    del self.closed[j]
+                    break
+        elif op == "move" and i != -1:
+            self.tabs.insert(min(record["index"], len(self.tabs) - 1), self.tabs.pop(i))
+        elif op == "navigate" and i != -1:
+            self.tabs[i]["url"] = record["url"]
+        elif op == "title" and i != -1:
+            self.tabs[i]["title"] = record["title"]
+        elif op == "activate":
+            self.active = record.get("id")
@@ -1,11 +1,10 @@
-from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtCore import Qt, QObject, QEvent
+from storage import home_url
 
 class Shortcuts(QObject):
     def __init__(self, browser):
         super().__init__(browser)
         self.browser = browser
-        self.closed_tabs_stack = []  # For reopening closed tabs
         self.browser.installEventFilter(self)  # Capture all key presses
 
     def eventFilter(self, obj, event):
@@ -51,10 +50,8 @@ class Shortcuts(QObject):
 
     # ---------- Shortcut functions ----------
     def current_webview(self):
-        tab = self.browser.tabs.currentWidget()
-        if tab:
-            return tab.findChild(QWebEngineView)
-        return None
+        # Rebuilds the view if the current tab was discarded
+        return self.browser.web_view(self.browser.tabs.currentWidget())
 
     def go_back(self):
         webview = self.current_webview()
@@ -72,30 +69,23 @@ class Shortcuts(QObject):
             webview.reload()
 
     def new_tab(self):
-        self.browser.add_tab("https://google.com", "New Tab")
+        self.browser.add_tab(home_url(), "New Tab")
 
     def close_tab(self):
         index = self.browser.tabs.currentIndex()
         if index != -1:
-            tab = self.browser.tabs.widget(index)
-            webview = tab.findChild(QWebEngineView)
-            if webview:
-                self.closed_tabs_stack.append((webview.url().toString(), self.browser.tabs.tabText(index)))
-            self.browser.close_tab(index)
+            self.browser.close_tab(index)  # keeps it on browser.closed_tabs for reopening
 
     def reopen_last_closed_tab(self):
-        if self.closed_tabs_stack:
-            url, label = self.closed_tabs_stack.pop()
-            self.browser.add_tab(url, label)
+        self.browser.reopen_closed_tab()
 
     def duplicate_tab(self):
         tab = self.browser.tabs.currentWidget()
         if tab:
-            webview = tab.findChild(QWebEngineView)
-            if webview:
-                url = webview.url().toString()
-                label = self.browser.tabs.tabText(self.browser.tabs.currentIndex())
-                self.browser.add_tab(url, label)
+            snapshot = self.browser.tab_snapshot(tab)
+            if snapshot.url:
+                # The original is already on screen, so the copy loads when the scheduler has room
+                self.browser.add_tab(label=snapshot.title, background=True, preload=True, snapshot=snapshot)
 
     def mute_tab(self):
         webview = self.current_webview()
@@ -0,0 +1,40 @@
+# startup.py
+import json
+import sys
+import time
+
+
+class StartupProfiler:
+    """
+    Records named startup phases as wall-clock offsets from process start and
+    reports them as a table or as JSON (for tracking regressions between builds).
+    Kept free of Qt imports so it can time the Qt imports themselves.
+    """
+    def __init__(self, start=None, enabled=True):
+        self.start = time.perf_counter() if start is None else start
+        self.enabled = enabled
+        self.marks = []  # (phase, seconds since start)
+
+    def mark(self, phase):
+        if self.enabled and phase not in dict(self.marks):
+            self.marks.append((phase, time.perf_counter() - self.start))
+
+    def phases(self):
+        """{phase: ms spent in that phase}, in the order the phases completed."""
+        result, previous = {}, 0.0
+        for phase, at in self.marks:
+            result[phase] = round((at - previous) * 1000, 1)
+            previous = at
+        return result
+
+    def to_json(self):
+        return json.dumps({
+            "phases_ms": self.phases(),
+            "cumulative_ms": {phase: round(at * 1000, 1) for phase, at in self.marks},
+            "total_ms": round(self.marks[-1][1] * 1000, 1) if self.marks else 0.0,
+        }, indent=2)
+
+    def report(self, stream=sys.stderr):
+        print(f"{'Startup phase':<20}{'phase ms':>10}{'total ms':>10}", file=stream)
+        for (phase, at), spent in zip(self.marks, self.phases().values()):
+            print(f"{phase:<20}{spent:>10.1f}{at * 1000:>10.1f}", file=stream)
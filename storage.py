@@ -0,0 +1,91 @@
+# storage.py
+import os
+from PyQt5.QtCore import QStandardPaths, QSettings
+
+APP_DIR_NAME = "Cobalt Browser"
+DEFAULT_HOME_URL = "https://google.com"
+DEFAULT_CACHE_MAX_MB = 512
+PROCESS_MODELS = ("default", "process-per-site", "process-per-site-instance")
+
+
+def data_dir():
+    """
+    Per-user directory for persistent browser state. COBALT_DATA_DIR overrides it,
+    which keeps benchmarks and throwaway profiles away from the real one.
+    """
+    path = os.environ.get("COBALT_DATA_DIR") or os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation), APP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(*parts):
+    return os.path.join(data_dir(), *parts)
+
+
+def settings():
+    """User preferences, stored as an INI file next to the rest of the browser's state."""
+    return QSettings(data_path("settings.ini"), QSettings.IniFormat)
+
+
+def smooth_scroll_enabled():
+    return settings().value("smooth_scroll", True, type=bool)
+
+
+def content_blocking_enabled():
+    return settings().value("content_blocking", True, type=bool)
+
+
+def page_text_indexing_enabled():
+    # Off unless the user opts in: it keeps a copy of the text of every page visited
+    return settings().value("page_text_indexing", False, type=bool)
+
+
+def prefetch_enabled():
+    return settings().value("prefetch", True, type=bool)
+
+
+def http_cache_max_mb():
+    """Size cap of the on-disk HTTP cache shared by all tabs."""
+    return settings().value("cache_max_mb", DEFAULT_CACHE_MAX_MB, type=int)
+
+
+def download_bandwidth_limit():
+    """Cap on total download speed in KB/s; 0 means none."""
+    return settings().value("download_kbps", 0, type=int)
+
+
+def process_model():
+    """Renderer process model from PROCESS_MODELS; read once at startup."""
+    model = settings().value("process_model", "default")
+    return model if model in PROCESS_MODELS else "default"
+
+
+def renderer_process_limit():
+    """Most renderer processes Chromium should start (0 for its own default)."""
+    return settings().value("renderer_process_limit", 0, type=int)
+
+
+def process_model_flags(model=None, limit=None):
+    """
+    Chromium switches for a process model and renderer cap, defaulting to the
+    saved settings. A cap also turns off the site isolation trial: otherwise
+    Chromium never puts pages from different sites in one process, and the cap
+    is exceeded as soon as the tabs span more sites than it allows.
+    """
+    model = process_model() if model is None else model
+    limit = renderer_process_limit() if limit is None else limit
+    flags = [] if model == "default" else ["--" + model]
+    if limit:
+        flags += [f"--renderer-process-limit={limit}", "--disable-site-isolation-trials"]
+    return flags
+
+
+def home_url():
+    """Where Home and new tabs open; benchmarks point it at a local server."""
+    return settings().value("home_url", DEFAULT_HOME_URL) or DEFAULT_HOME_URL
+
+
+def suggest_endpoint():
+    """Override for the omnibox suggestion service, or "" for the built-in one."""
+    return settings().value("suggest_url", "")
@@ -0,0 +1,137 @@
+# suggestions.py
+import json
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QTimer, QUrl, QUrlQuery
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+
+SUGGEST_URL = "https://suggestqueries.google.com/complete/search"
+DEBOUNCE_MS = 150
+CACHE_SIZE = 512
+CACHE_TTL = 10 * 60  # seconds
+
+
+class LRUCache:
+    """Size-capped LRU mapping whose entries also expire after ttl seconds."""
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stamp, value = entry
+        if time.monotonic() - stamp > self.ttl:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SuggestionProvider(QObject):
+    """
+    Omnibox suggestions with a debounce window, one in-flight request at a time
+    (a newer keystroke aborts the older reply), a prefix cache, and sequence
+    numbers so a slow reply can never overwrite newer results.
+    """
+    def __init__(self, parent=None, endpoint=SUGGEST_URL, debounce_ms=DEBOUNCE_MS):
+        super().__init__(parent)
+        self.endpoint = endpoint
+        self.cache = LRUCache()
+        self.stats = {"keystrokes": 0, "requests": 0, "cache_hits": 0, "stale_dropped": 0}
+        self._nam = None
+        self._seq = 0
+        self._pending = None
+        self._reply = None
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._send)
+
+    @property
+    def nam(self):
+        if self._nam is None:
+            self._nam = QNetworkAccessManager(self)
+        return self._nam
+
+    def request(self, text, callback):
+        """Calls callback(list_of_suggestions) once results for text are available."""
+        self._seq += 1
+        self.stats["keystrokes"] += 1
+        query = text.strip()
+        if not query:
+            self.cancel()
+            return
+
+        cached = self.cache.get(query)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            self.cancel()
+            callback(cached)
+            return
+
+        # The reply in flight is for an older prefix; don't let it hold the connection
+        if self._reply is not None:
+            self._reply.abort()
+            self._reply = None
+        self._pending = (query, callback, self._seq)
+        self._debounce.start()  # restarting pushes the deadline back
+
+    def cancel(self):
+        self._debounce.stop()
+        self._pending = None
+        if self._reply is not None:
+            self._reply.abort()
+            self._reply = None
+
+    def _send(self):
+        if self._pending is None:
+            return
+        query, callback, seq = self._pending
+        self._pending = None
+        if self._reply is not None:
+            self._reply.abort()
+
+        url = QUrl(self.endpoint)
+        params = QUrlQuery()
+        params.addQueryItem("client", "firefox")
+        params.addQueryItem("q", query)  # QUrlQuery percent-encodes the query
+        url.setQuery(params)
+
+        reply = self.nam.get(QNetworkRequest(url))
+        self._reply = reply
+        self.stats["requests"] += 1
+        reply.finished.connect(lambda r=reply: self._on_reply(r, query, callback, seq))
+
+    def _on_reply(self, reply, query, callback, seq):
+        reply.deleteLater()
+        if reply is self._reply:
+            self._reply = None
+        if reply.error() == QNetworkReply.OperationCanceledError:
+            return
+        if reply.error():
+            print("Error fetching suggestions:", reply.errorString())
+            return
+        try:
+            suggestions = json.loads(str(reply.readAll(), 'utf-8'))[1]
+        except Exception as e:
+            print("Error parsing suggestions:", e)
+            return
+
+        self.cache.put(query, suggestions)
+        if seq != self._seq:
+            self.stats["stale_dropped"] += 1
+            return
+        callback(suggestions)
@@ -0,0 +1,217 @@
+# taskmanager.py
+import json
+import os
+import time
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QHeaderView, QFileDialog, QLabel
+)
+from metrics import process_rss_kb
+
+SAMPLE_INTERVAL = 1000  # ms, only while the window is open
+
+NAVIGATION_TIMING_JS = """
+(function() {
+    var nav = performance.getEntriesByType('navigation')[0];
+    if (!nav || !nav.loadEventStart) return null;
+    // Read from loadFinished, possibly while load handlers are still running
+    return {ttfb: nav.responseStart, dcl: nav.domContentLoadedEventEnd,
+            load: nav.loadEventEnd || nav.loadEventStart};
+})()
+"""
+
+COLUMNS = ("Tab", "PID", "Memory (MB)", "CPU %", "Load (ms)", "TTFB (ms)", "DOMContentLoaded (ms)", "Load event (ms)")
+PROCESS_COLUMNS = ("Renderer PID", "Memory (MB)", "Tabs")
+
+
+def _cpu_ticks(pid):
+    """utime + stime of pid in clock ticks, from /proc/<pid>/stat; None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, so split after its closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class CpuSampler:
+    """CPU usage per PID as a percentage of one core since the previous sample."""
+    def __init__(self):
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._last = {}
+
+    def sample(self, pid):
+        ticks, now = _cpu_ticks(pid), time.monotonic()
+        if ticks is None:
+            return None
+        previous = self._last.get(pid)
+        self._last[pid] = (ticks, now)
+        if previous is None or now <= previous[1]:
+            return None
+        return 100.0 * (ticks - previous[0]) / self.ticks_per_second / (now - previous[1])
+
+
+def tab_report(browser, cpu=None):
+    """
+    One dict per tab: renderer PID, RSS, CPU, the loadStarted→loadFinished time and
+    the page's Navigation Timing metrics. Discarded tabs report no process.
+    """
+    rows = []
+    cpu_by_pid = {}
+    for i in range(browser.tabs.count()):
+        tab = browser.tabs.widget(i)
+        web_view = browser.web_view(tab, restore=False)
+        pid = web_view.page().renderProcessPid() if web_view is not None else 0
+        if pid > 0 and cpu is not None and pid not in cpu_by_pid:
+            cpu_by_pid[pid] = cpu.sample(pid)
+        timing = getattr(tab, "nav_timing", None) or {}
+        rows.append({
+            "index": i,
+            "title": browser.tabs.tabText(i),
+            "url": browser.tab_url(tab),
+            "discarded": web_view is None,
+            "pid": pid or None,
+            "rss_kb": process_rss_kb(pid) if pid > 0 else None,
+            "cpu_percent": cpu_by_pid.get(pid),
+            "load_ms": getattr(tab, "load_ms", None),
+            "ttfb_ms": timing.get("ttfb"),
+            "dom_content_loaded_ms": timing.get("dcl"),
+            "load_event_ms": timing.get("load"),
+        })
+    return rows
+
+
+def renderer_report(browser):
+    """
+    One dict per renderer process, largest first: PID, RSS and the titles of the
+    tabs it hosts. Tabs can share a process, so this is where memory adds up.
+    """
+    rss, owners = browser.hibernator.renderer_memory()
+    rows = [{
+        "pid": pid,
+        "rss_kb": rss[pid],
+        "tabs": [browser.tabs.tabText(browser.tabs.indexOf(tab)) for tab in tabs],
+    } for pid, tabs in owners.items()]
+    rows.sort(key=lambda row: row["rss_kb"] or 0, reverse=True)
+    return rows
+
+
+class TaskManager(QDialog):
+    """
+    Lists every tab with its renderer process and load timings. Sampling runs
+    on a timer that only exists while this window is visible.
+    """
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.cpu = CpuSampler()
+        self.setWindowTitle("Task Manager")
+        self.resize(900, 400)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.process_table = QTableWidget(0, len(PROCESS_COLUMNS))
+        self.process_table.setHorizontalHeaderLabels(PROCESS_COLUMNS)
+        self.process_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.process_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.process_table.setMaximumHeight(160)
+        layout.addWidget(self.process_table)
+        self.process_label = QLabel()
+        layout.addWidget(self.process_label)
+
+        buttons = QHBoxLayout()
+        self.load_label = QLabel()
+        buttons.addWidget(self.load_label)
+        self.cache_label = QLabel()
+        buttons.addWidget(self.cache_label)
+        buttons.addStretch()
+        save_btn = QPushButton("Save as JSON…")
+        save_btn.clicked.connect(self.save_json)
+        buttons.addWidget(save_btn)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(SAMPLE_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def snapshot(self):
+        return tab_report(self.browser, self.cpu)
+
+    def refresh(self):
+        rows = self.snapshot()
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            rss = row["rss_kb"]
+            values = (
+                row["title"] + (" (discarded)" if row["discarded"] else ""),
+                row["pid"],
+                None if rss is None else round(rss / 1024, 1),
+                None if row["cpu_percent"] is None else round(row["cpu_percent"], 1),
+                row["load_ms"],
+                row["ttfb_ms"],
+                row["dom_content_loaded_ms"],
+                row["load_event_ms"],
+            )
+            for c, value in enumerate(values):
+                if isinstance(value, float):
+                    value = round(value, 1)
+                item = QTableWidgetItem("" if value is None else str(value))
+                if c:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+
+        self._refresh_processes()
+
+        loads = self.browser.load_stats()
+        wait = loads["wait_ms"]
+        self.load_label.setText(
+            f"Loads: {loads['running']} running, {loads['queued']} queued"
+            + (f" · queue wait p50 {wait['p50']:.0f} ms, p95 {wait['p95']:.0f} ms" if wait["count"] else ""))
+        net = self.browser.network_stats()
+        saved = net["time_saved_ms"]
+        self.cache_label.setText(
+            ("Cache hits: n/a" if net["cache_hit_rate"] is None else f"Cache hits: {net['cache_hit_rate']:.0%}")
+            + f" · {net['prefetches']} prefetched, {net['preconnects']} preconnected"
+            + (f" · saved p50 {saved['p50']:.0f} ms on {saved['count']} loads" if saved["count"] else ""))
+
+    def _refresh_processes(self):
+        rows = renderer_report(self.browser)
+        self.process_table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            rss = row["rss_kb"]
+            values = (str(row["pid"]), "" if rss is None else f"{rss / 1024:.1f}", ", ".join(row["tabs"]))
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c < 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.process_table.setItem(r, c, item)
+        # What Chromium was actually started with, which --process-model may have overridden
+        flags = [f for f in os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+                 if f.startswith(("--process-per-site", "--renderer-process-limit",
+                                  "--disable-site-isolation-trials"))]
+        total_kb = sum(row["rss_kb"] or 0 for row in rows)
+        self.process_label.setText(
+            f"Renderers: {len(rows)} processes, {total_kb / 1024:.1f} MB total · "
+            + (" ".join(flags) if flags else "default process model"))
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Task Manager Data", "tabs.json", "JSON (*.json)")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server import StandInServer
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+@pytest.fixture
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A throwaway profile, so nothing touches the real browser state."""
+    path = tmp_path / "profile"
+    monkeypatch.setenv("COBALT_DATA_DIR", str(path))
+    return path
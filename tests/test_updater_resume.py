@@ -0,0 +1,134 @@
+# tests/test_updater_resume.py
+"""
+downloads.Download (the engine behind the updater and the Downloads window)
+against the local stand-in server: checkpoint resume, 416 restarts, the
+updater's checksum check and the bandwidth cap.
+"""
+import hashlib
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtNetwork")  # the tests drive the real Qt network stack
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtNetwork import QNetworkAccessManager
+
+import downloads
+import updater
+from downloads import Download, TokenBucket
+
+TIMEOUT = 30000  # ms before a test gives up on a download
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def run(download):
+    """Starts download and spins the event loop until it finishes; returns (ok, error)."""
+    loop, result = QEventLoop(), []
+    download.finished.connect(lambda ok, error: (result.append((ok, error)), loop.quit()))
+    QTimer.singleShot(TIMEOUT, loop.quit)
+    download.start()
+    loop.exec_()
+    assert result, "download did not finish"
+    return result[-1]
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(downloads, "RETRY_BASE_DELAY", 10)
+
+
+def test_cut_connection_resumes_from_checkpoint(qapp, server, tmp_path):
+    payload = os.urandom(1024 * 1024)
+    url = server.add_file("setup.exe", payload, cut_after=300 * 1024, cut_times=1)
+    dest = str(tmp_path / "setup.exe")
+
+    # No retries: the cut leaves the partial and its .part.json behind
+    ok, _ = run(Download(QNetworkAccessManager(), url, dest, max_retries=0))
+    assert not ok
+    with open(dest + ".part.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    (_, end, pos), = meta["segments"]
+    assert 0 < pos < len(payload) and end == len(payload) - 1
+
+    # A fresh Download, as after a restart, continues from the checkpoint
+    download = Download(QNetworkAccessManager(), url, dest)
+    ok, error = run(download)
+    assert ok, error
+    assert download.resumes == 1
+    assert server.requests[-1][2].get("Range") == f"bytes={pos}-{end}"
+    assert download.sha256() == sha256(payload)
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+    assert not os.path.exists(dest + ".part") and not os.path.exists(dest + ".part.json")
+
+
+def test_416_restarts_from_scratch(qapp, server, tmp_path):
+    payload = os.urandom(256 * 1024)
+    url = server.add_file("setup.exe", payload)
+    dest = str(tmp_path / "setup.exe")
+
+    # A checkpoint from a longer version of the file: its range now starts past the end
+    length = len(payload) + 4096
+    with open(dest + ".part", "wb") as f:
+        f.write(b"\0" * length)
+    with open(dest + ".part.json", "w", encoding="utf-8") as f:
+        json.dump({"url": url, "etag": server.files["setup.exe"]["etag"], "length": length,
+                   "segments": [[0, length - 1, len(payload) + 1024]]}, f)
+
+    download = Download(QNetworkAccessManager(), url, dest)
+    ok, error = run(download)
+    assert ok, error
+    ranges = [headers.get("Range") for _, _, headers in server.requests]
+    assert ranges[0] == f"bytes={len(payload) + 1024}-{length - 1}"
+    assert ranges[-1] is None  # started over with a plain GET
+    assert download.sha256() == sha256(payload)
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+
+
+@pytest.mark.parametrize("matches", [True, False])
+def test_updater_checksum(qapp, server, tmp_path, data_dir, monkeypatch, matches):
+    payload = os.urandom(128 * 1024)
+    url = server.add_file("setup.exe", payload)
+    expected = sha256(payload) if matches else sha256(b"something else")
+
+    errors, launched = [], []
+    monkeypatch.setattr(updater.QMessageBox, "critical", lambda parent, title, text: errors.append(text))
+    monkeypatch.setattr(updater.QMessageBox, "warning", lambda parent, title, text: errors.append(text))
+    monkeypatch.setattr(updater.Updater, "_launch_installer", lambda self: launched.append(self.dest_path))
+
+    upd = updater.Updater(None, "1.0.0", server.url("/updates.json"), app_name="Test")
+    upd.dest_path = str(tmp_path / "setup.exe")
+    loop = QEventLoop()
+    upd._start_download(url, upd.dest_path, "Downloading update...",
+                        lambda ok, error: (upd._on_download_finished(ok, error, expected), loop.quit()))
+    QTimer.singleShot(TIMEOUT, loop.quit)
+    loop.exec_()
+
+    if matches:
+        assert launched == [upd.dest_path] and not errors
+        assert os.path.exists(upd.dest_path)
+    else:
+        assert not launched
+        assert errors == ["Checksum mismatch. Aborting."]
+        assert not os.path.exists(upd.dest_path)
+
+
+def test_bandwidth_cap(qapp, server, tmp_path):
+    rate = 1024 * 1024
+    payload = os.urandom(2 * rate)
+    url = server.add_file("setup.exe", payload)
+
+    download = Download(QNetworkAccessManager(), url, str(tmp_path / "setup.exe"), bucket=TokenBucket(rate))
+    start = time.perf_counter()
+    ok, error = run(download)
+    elapsed = time.perf_counter() - start
+    assert ok, error
+    assert download.sha256() == sha256(payload)
+    # The bucket starts empty and can save up at most one burst
+    assert elapsed >= (len(payload) / rate - downloads.BUCKET_BURST) * 0.9
@@ -1,15 +1,85 @@
 import sys
 import os
 import json
+import time
 from PyQt5.QtWidgets import (
-    QMainWindow, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QWidget,
+    QMainWindow, QVBoxLayout, QLineEdit, QPushButton, QWidget,
     QProgressBar, QTabWidget, QAction, QInputDialog, QTabBar, QToolButton,
-    QGraphicsDropShadowEffect, QLabel, QCompleter, QMenu
+    QGraphicsDropShadowEffect, QLabel, QCompleter, QMenu, QApplication, QDialog,
+    QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QToolBar
 )
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtCore import QUrl, Qt, QObject, QEvent, QTimer
+from PyQt5.QtWebEngineWidgets import (
+    QWebEngineView, QWebEnginePage, QWebEngineScript, QWebEngineContextMenuData
+)
+from PyQt5.QtCore import QUrl, Qt, QObject, QEvent, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor, QFont, QIcon
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from metrics import RateCounter, LatencyStats
+from hibernation import TabHibernator, TabSnapshot
+from suggestions import SuggestionProvider, SUGGEST_URL
+from history import HistoryStore
+from omnibox import PrefixIndex
+from bookmarks import BookmarkStore, ROOT
+from session import SessionJournal
+from loadscheduler import LoadScheduler
+from closedtabs import ClosedTabStack
+from pagetext import PageTextIndex
+from taskmanager import TaskManager, tab_report, renderer_report, NAVIGATION_TIMING_JS
+from adblock import AdBlockInterceptor
+from webprofile import browser_profile, Prefetcher, CacheStats
+from downloads import DownloadManager, DownloadsWindow
+from storage import (
+    data_path, settings, smooth_scroll_enabled, content_blocking_enabled, home_url, suggest_endpoint,
+    page_text_indexing_enabled
+)
+
+OMNIBOX_SEED_LIMIT = 20000  # most recent history entries loaded into the completion index
+BOOKMARK_MENU_LIMIT = 500  # per folder; beyond this the menu points at search
+PAGE_TEXT_DELAY = 2000     # ms after loadFinished before a page's text is captured for the index
+
+# ------------------ Smooth scroll ------------------
+SMOOTH_SCROLL_SCRIPT = "cobalt-smooth-scroll"
+SMOOTH_SCROLL_JS = """
+(function() {
+    // Injected at document creation into every frame; the guard keeps it to one set of listeners
+    if (window.__cobaltSmoothScroll) return;
+    window.__cobaltSmoothScroll = true;
+
+    function smooth() { document.documentElement.style.scrollBehavior = 'smooth'; }
+    if (document.documentElement) smooth();
+    else document.addEventListener('DOMContentLoaded', smooth, {once: true});
+
+    // Wheel and touchpad input is left to Chromium's own smooth scrolling so it stays on the
+    // compositor thread; only keys are handled here, and never while the user is typing.
+    document.addEventListener('keydown', function(e) {
+        if (e.defaultPrevented || e.ctrlKey || e.altKey || e.metaKey) return;
+        var t = e.target;
+        if (t && (t.isContentEditable || /^(INPUT|TEXTAREA|SELECT)$/.test(t.tagName))) return;
+        var amount = 40;
+        if (e.key === 'ArrowDown') { window.scrollBy({top: amount, behavior: 'smooth'}); e.preventDefault(); }
+        if (e.key === 'ArrowUp')   { window.scrollBy({top: -amount, behavior: 'smooth'}); e.preventDefault(); }
+        if (e.key === 'PageDown')  { window.scrollBy({top: window.innerHeight, behavior: 'smooth'}); e.preventDefault(); }
+        if (e.key === 'PageUp')    { window.scrollBy({top: -window.innerHeight, behavior: 'smooth'}); e.preventDefault(); }
+    });
+})();
+"""
+
+
+def install_smooth_scroll(profile, enabled=True):
+    """Registers (or removes) the smooth-scroll user script on profile; safe to call repeatedly."""
+    scripts = profile.scripts()
+    existing = scripts.findScript(SMOOTH_SCROLL_SCRIPT)
+    if not existing.isNull():
+        if enabled:
+            return
+        scripts.remove(existing)
+    if enabled:
+        script = QWebEngineScript()
+        script.setName(SMOOTH_SCROLL_SCRIPT)
+        script.setSourceCode(SMOOTH_SCROLL_JS)
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ApplicationWorld)
+        script.setRunsOnSubFrames(True)
+        scripts.insert(script)
 
 # ------------------ Close Button ------------------
 class OutlineButton(QToolButton):
@@ -64,23 +134,43 @@ class PlusButton(QToolButton):
 
 # ------------------ TabBar Watcher ------------------
 class TabBarWatcher(QObject):
+    """
+    Keeps the plus button pinned after the last tab. Layout is driven by tab bar
+    events only; bursts of changes are coalesced into one pass per event-loop turn.
+    """
+    LAYOUT_EVENTS = (
+        QEvent.Resize, QEvent.Show, QEvent.Move, QEvent.LayoutRequest,
+        QEvent.FontChange, QEvent.StyleChange,
+    )
+
     def __init__(self, tab_widget, plus_button):
-        super().__init__()
+        super().__init__(tab_widget)
         self.tab_widget = tab_widget
         self.plus_button = plus_button
         self.tab_bar = tab_widget.tabBar()
         self.tab_bar.installEventFilter(self)
-        self.timer = QTimer()
-        self.timer.setInterval(10)
-        self.timer.timeout.connect(self.update_plus_button_position)
-        self.timer.start()
+        self.layout_passes = RateCounter()
+
+        # Zero-interval single shot: fires once when control returns to the event loop
+        self._pending = QTimer(self)
+        self._pending.setSingleShot(True)
+        self._pending.setInterval(0)
+        self._pending.timeout.connect(self.update_plus_button_position)
+
+        self.tab_bar.tabMoved.connect(lambda *args: self.schedule_update())
+        self.tab_bar.currentChanged.connect(lambda *args: self.schedule_update())
 
     def eventFilter(self, obj, event):
-        if obj == self.tab_bar and event.type() in (QEvent.Resize, QEvent.Show, QEvent.Move):
-            self.update_plus_button_position()
+        if obj == self.tab_bar and event.type() in self.LAYOUT_EVENTS:
+            self.schedule_update()
         return super().eventFilter(obj, event)
 
+    def schedule_update(self):
+        if not self._pending.isActive():
+            self._pending.start()
+
     def update_plus_button_position(self):
+        self.layout_passes.tick()
         count = self.tab_bar.count()
         x = 4 if count == 0 else self.tab_bar.tabRect(count - 1).right() + 5
         y = (self.tab_bar.height() - self.plus_button.height()) // 2
@@ -88,7 +178,54 @@ class TabBarWatcher(QObject):
         self.plus_button.raise_()
 
 # ------------------ Browser ------------------
+class NavState:
+    """What the shared address bar shows for a tab while it isn't the current one."""
+    __slots__ = ("typed", "cursor")
+
+    def __init__(self):
+        self.typed = None  # text the user was editing, or None to show the tab's URL
+        self.cursor = 0
+
+
+class SearchDialog(QDialog):
+    """
+    Search-as-you-type list. search(text) yields (label, url, title) results;
+    Enter or double-click opens one.
+    """
+    def __init__(self, browser, title, placeholder, search):
+        super().__init__(browser)
+        self.browser = browser
+        self.search = search
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(title)
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+        self.query = QLineEdit()
+        self.query.setPlaceholderText(placeholder)
+        self.query.textEdited.connect(self.refresh)
+        layout.addWidget(self.query)
+        self.results = QListWidget()
+        self.results.setWordWrap(True)
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results)
+
+    def refresh(self, text):
+        self.results.clear()
+        for label, url, title in self.search(text):
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, (url, title))
+            self.results.addItem(item)
+
+    def open_item(self, item):
+        url, title = item.data(Qt.UserRole)
+        self.browser.open_bookmark(url, title)
+
+
 class Browser(QMainWindow):
+    first_paint = pyqtSignal()        # once per window, on its first paint
+    first_page_loaded = pyqtSignal()  # once per window, when any tab first finishes loading
+
     def __init__(self):
         super().__init__()
 
@@ -105,23 +242,89 @@ class Browser(QMainWindow):
         self.setGeometry(100, 100, 1000, 700)
         self.setWindowFlags(Qt.Window)  # Ensure taskbar shows icon
 
-        self.network_manager = QNetworkAccessManager()
+        self.suggestions = SuggestionProvider(self, suggest_endpoint() or SUGGEST_URL)
+        self.context_menu_latency = LatencyStats()  # ms from right mouse press to menu shown
+        self._first_load_done = False
+        self._first_paint_done = False
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(False)
         self.tabs.setMovable(True)
         self.tabs.tabBar().setExpanding(False)
         self.setCentralWidget(self.tabs)
 
-        self.bookmarks = []
-        self.history = []
+        # Every navigation goes through here so background loads can't crowd out the current tab
+        self.loads = LoadScheduler(self)
+
+        self.bookmarks = BookmarkStore(data_path("bookmarks.sqlite"))
+        self.history = HistoryStore(data_path("history.sqlite"))
+
+        # Local completions: kept current per visit, seeded from stored history off the startup path
+        self.omnibox_index = PrefixIndex()
+        self._omnibox_seeded = False
+        self.history.listeners.append(self.omnibox_index.record_visit)
+        self.first_page_loaded.connect(lambda: QTimer.singleShot(0, self.seed_omnibox))
 
         # Menu
         self.menu = self.menuBar()
+        self.view_menu = self.menu.addMenu("View")
+        smooth_action = QAction("Smooth Scrolling", self, checkable=True)
+        smooth_action.setChecked(smooth_scroll_enabled())
+        smooth_action.toggled.connect(self.set_smooth_scroll)
+        self.view_menu.addAction(smooth_action)
+        install_smooth_scroll(browser_profile(), smooth_scroll_enabled())
+
+        # Content blocking: EasyList-style *.txt lists dropped into <data dir>/filters
+        self.adblock = AdBlockInterceptor(data_path("filters"), data_path("filters.bin"), self)
+        self.adblock.enabled = content_blocking_enabled()
+        browser_profile().setUrlRequestInterceptor(self.adblock)
+
+        # Speculative preconnect/prefetch of confident omnibox matches, and cache hit metrics
+        self.prefetcher = Prefetcher(browser_profile(), self)
+        self.cache_stats = CacheStats()
+
+        # Downloads: segmented, throttled and resumable, shared with the updater. The manager
+        # (its own network stack and a copy of the cookie jar) is built on first use, or once
+        # the first page is up if last run left downloads behind
+        self._downloads = None
+        self.downloads_window = None
+        browser_profile().downloadRequested.connect(lambda item: self.download_manager().take_over(item))
+        self.first_page_loaded.connect(self._resume_downloads)
+
+        self.tools_menu = self.menu.addMenu("Tools")
+        adblock_action = QAction("Block Ads and Trackers", self, checkable=True)
+        adblock_action.setChecked(self.adblock.enabled)
+        adblock_action.toggled.connect(self.set_content_blocking)
+        self.tools_menu.addAction(adblock_action)
+        page_text_action = QAction("Index Page Text for History Search", self, checkable=True)
+        page_text_action.setChecked(page_text_indexing_enabled())
+        page_text_action.toggled.connect(self.set_page_text_indexing)
+        self.tools_menu.addAction(page_text_action)
+        search_history_action = QAction("Search Page History…", self)
+        search_history_action.setShortcut("Ctrl+H")
+        search_history_action.triggered.connect(self.search_page_history)
+        self.tools_menu.addAction(search_history_action)
+        self._page_text = None
+        self._page_text_enabled = page_text_indexing_enabled()
+
+        downloads_action = QAction("Downloads", self)
+        downloads_action.setShortcut("Ctrl+J")
+        downloads_action.triggered.connect(self.show_downloads)
+        self.tools_menu.addAction(downloads_action)
+        task_manager_action = QAction("Task Manager", self)
+        task_manager_action.setShortcut("Shift+Esc")
+        task_manager_action.triggered.connect(self.show_task_manager)
+        self.tools_menu.addAction(task_manager_action)
+        self.task_manager = None
+
         self.bookmarks_menu = self.menu.addMenu("Bookmarks")
-        add_bookmark_action = QAction("Add Bookmark", self)
-        add_bookmark_action.triggered.connect(self.add_bookmark)
-        self.bookmarks_menu.addAction(add_bookmark_action)
-        self.bookmarks_menu.addSeparator()
+        self.bookmarks_menu.folder_id = ROOT
+        self.bookmarks_menu.generation = None
+        self.bookmarks_menu.aboutToShow.connect(lambda: self.populate_bookmarks_menu(self.bookmarks_menu))
+
+        # Navigation bar: one for the window, bound to whichever tab is current
+        self._nav_tab = None
+        self.build_nav_bar()
+        self.tabs.currentChanged.connect(self.bind_nav_bar)
 
         # Progress bar
         self.progress = QProgressBar()
@@ -129,36 +332,46 @@ class Browser(QMainWindow):
         self.statusBar().addPermanentWidget(self.progress)
 
         # Plus button
-        self.plus_button = PlusButton(self.tabs, lambda: self.add_tab("https://google.com", "New Tab"))
+        self.plus_button = PlusButton(self.tabs, lambda: self.add_tab(home_url(), "New Tab"))
         self.plus_button.setParent(self.tabs)
         self.plus_button.show()
 
         # Watcher
         self.watcher = TabBarWatcher(self.tabs, self.plus_button)
-        self.tabs.tabBar().tabMoved.connect(lambda *args: self.watcher.update_plus_button_position())
 
-        # Initial tab
-        self.add_tab("https://google.com", "Home")
+        # Background tab discarding
+        self.hibernator = TabHibernator(self)
+
+        # Session journal; tabs come back from the last run, or we start at Home
+        self.session = SessionJournal(data_path())
+        # Closed tabs from this run keep their history; last run's come back as URL and title only
+        self.closed_tabs = ClosedTabStack.from_session(self.session.closed)
+        self._next_tab_id = 1
+        self._restoring_session = False
+        self.tabs.currentChanged.connect(self._journal_activate)
+        self.tabs.tabBar().tabMoved.connect(self._journal_move)
+        self.open_initial_tabs()
+
+    # ------------------ Navigation bar ------------------
+    def build_nav_bar(self):
+        self.nav_bar = QToolBar("Navigation", self)
+        self.nav_bar.setMovable(False)
+        self.addToolBar(self.nav_bar)
 
-    # ------------------ Add Tab ------------------
-    def add_tab(self, url=None, label="New Tab"):
-        tab = QWidget()
-        layout = QVBoxLayout(tab)
-
-        # Navigation bar
-        nav_layout = QHBoxLayout()
         back_btn = QPushButton("←")
         forward_btn = QPushButton("→")
         reload_btn = QPushButton("⟳")
         url_bar = QLineEdit()
         url_bar.setPlaceholderText("Search or enter web address")
         url_bar.setStyleSheet("QLineEdit { border-radius: 12px; padding: 4px; border: 1px solid gray; }")
-
         url_bar._user_typing = False
         url_bar.installEventFilter(self)
+        self.url_bar = url_bar
 
         completer = QCompleter([], url_bar)
         completer.setCaseSensitivity(Qt.CaseInsensitive)
+        # Results are already filtered and ranked, and title matches don't share the typed prefix
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
         url_bar.setCompleter(completer)
 
         def on_text_edited(text):
@@ -167,107 +380,275 @@ class Browser(QMainWindow):
 
         url_bar.textEdited.connect(on_text_edited)
 
-        nav_layout.addWidget(back_btn)
-        nav_layout.addWidget(forward_btn)
-        nav_layout.addWidget(reload_btn)
-        nav_layout.addWidget(url_bar)
-        layout.addLayout(nav_layout)
-
-        # Web view
-        web_view = QWebEngineView()
-        layout.addWidget(web_view)
-
-        # Smooth scrolling injection
-        web_view.loadFinished.connect(lambda _: self.enable_smooth_scroll(web_view))
+        for widget in (back_btn, forward_btn, reload_btn, url_bar):
+            self.nav_bar.addWidget(widget)
+
+        # The current tab's view may be discarded and rebuilt, so look it up on every use
+        url_bar.returnPressed.connect(self.load_typed_url)
+        back_btn.clicked.connect(lambda: self._current_view_call("back"))
+        forward_btn.clicked.connect(lambda: self._current_view_call("forward"))
+        reload_btn.clicked.connect(lambda: self._current_view_call("reload"))
+
+    def _current_view_call(self, name):
+        web_view = self.web_view(self.tabs.currentWidget())
+        if web_view is not None:
+            getattr(web_view, name)()
+
+    def bind_nav_bar(self, index):
+        """Stashes the outgoing tab's half-typed address and shows the incoming tab's."""
+        previous = self._nav_tab
+        if previous is not None and self.url_bar._user_typing:
+            previous.nav.typed = self.url_bar.text()
+            previous.nav.cursor = self.url_bar.cursorPosition()
+
+        tab = self.tabs.widget(index)
+        self._nav_tab = tab
+        if tab is None:
+            self.url_bar.clear()
+            return
+        if tab.nav.typed is not None:
+            self.url_bar.setText(tab.nav.typed)
+            self.url_bar.setCursorPosition(tab.nav.cursor)
+            self.url_bar._user_typing = True
+        else:
+            self.url_bar.setText(self.tab_url(tab))
+            self.url_bar._user_typing = False
 
-        url_bar.returnPressed.connect(lambda: self.load_url(web_view, url_bar))
-        web_view.urlChanged.connect(lambda qurl: url_bar.setText(qurl.toString()))
-        back_btn.clicked.connect(web_view.back)
-        forward_btn.clicked.connect(web_view.forward)
-        reload_btn.clicked.connect(web_view.reload)
+    def _on_url_changed(self, tab, qurl):
+        tab.nav.typed = None  # a navigation replaces whatever was being typed
+        if tab is self._nav_tab:
+            self.url_bar.setText(qurl.toString())
+            self.url_bar._user_typing = False
 
-        if url and not url.startswith("http"):
+    # ------------------ Add Tab ------------------
+    def add_tab(self, url=None, label="New Tab", background=False, preload=False, snapshot=None):
+        """
+        Opens url in a new tab. With background=True the tab is not selected and
+        only gets a placeholder label; its web view is created and starts loading
+        the first time the tab is shown, or, with preload=True, as soon as the load
+        scheduler has a free slot. Given a TabSnapshot, the tab gets its back/forward
+        history and scroll offset instead of a fresh load of url.
+        """
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(0, 0, 0, 0)
+        tab.snapshot = None
+        tab.placeholder = None
+        tab.nav = NavState()
+        tab.last_active = time.monotonic()  # a preloaded background tab isn't idle from the start
+        tab.tab_id = self._next_tab_id
+        self._next_tab_id += 1
+
+        if snapshot is not None:
+            url = snapshot.url
+        elif url and not url.startswith("http"):
             url = "http://" + url
-        if url:
-            web_view.load(QUrl(url))
 
-        # Custom context menu
-        web_view.setContextMenuPolicy(Qt.CustomContextMenu)
-        web_view.customContextMenuRequested.connect(
-            lambda pos, wv=web_view: self.show_custom_context_menu(pos, wv)
-        )
+        # Web view
+        if background:
+            # Same shape as a discarded tab, just without any history yet unless a snapshot was given
+            tab.snapshot = snapshot or TabSnapshot(url, label)
+            self.show_placeholder(tab, label)
+        else:
+            web_view = self.create_web_view(tab)
+            if snapshot is not None:
+                self.loads.request(tab, lambda: snapshot.restore(web_view), foreground=True)
+            elif url:
+                self.loads.request(tab, lambda: web_view.load(QUrl(url)), foreground=True)
 
         # Tab setup
         index = self.tabs.count()
         self.tabs.addTab(tab, "")
         self.set_tab_label(tab, label)
-        self.tabs.setCurrentWidget(tab)
+        if not background:
+            self.tabs.setCurrentWidget(tab)
 
         btn = OutlineButton(self, self.tabs, lambda tab=tab: self.tabs.indexOf(tab))
         btn.setFixedSize(16, 16)
         self.tabs.tabBar().setTabButton(index, QTabBar.RightSide, btn)
-        self.watcher.update_plus_button_position()
+        self.watcher.schedule_update()
 
-    # ------------------ Smooth scroll ------------------
-    def enable_smooth_scroll(self, web_view):
-        js = """
-        // Enable smooth scrolling for wheel, touchpad, and arrow keys
-        document.documentElement.style.scrollBehavior = 'smooth';
-
-        document.addEventListener('wheel', function(e) {
-            e.preventDefault();
-            window.scrollBy({top: e.deltaY, left: e.deltaX, behavior: 'smooth'});
-        }, {passive: false});
-
-        document.addEventListener('keydown', function(e) {
-            let amount = 40;
-            if (e.key === 'ArrowDown') { window.scrollBy({top: amount, behavior:'smooth'}); e.preventDefault(); }
-            if (e.key === 'ArrowUp')   { window.scrollBy({top: -amount, behavior:'smooth'}); e.preventDefault(); }
-            if (e.key === 'PageDown')  { window.scrollBy({top: window.innerHeight, behavior:'smooth'}); e.preventDefault(); }
-            if (e.key === 'PageUp')    { window.scrollBy({top: -window.innerHeight, behavior:'smooth'}); e.preventDefault(); }
-        });
+        if not self._restoring_session:
+            self.session.record("open", id=tab.tab_id, url=url or "", title=label, index=index)
+        if background and preload:
+            self.loads.request(tab, lambda: self.is_discarded(tab) and self.restore_tab(tab) is not None)
+        return tab
+
+    def create_web_view(self, tab):
+        web_view = QWebEngineView()
+        web_view.setPage(QWebEnginePage(browser_profile(), web_view))
+        tab.layout().addWidget(web_view)
+
+        web_view.loadFinished.connect(lambda _: self.hibernator.schedule_budget_check())
+        web_view.loadFinished.connect(self._on_first_load)
+        web_view.loadStarted.connect(lambda: self._on_load_started(tab))
+        web_view.loadFinished.connect(lambda ok: self._on_load_finished(tab, web_view, ok))
+        web_view.loadFinished.connect(lambda _: self.loads.finished(tab))
+        web_view.loadFinished.connect(lambda ok: ok and self.schedule_page_text_capture(tab))
+        web_view.loadFinished.connect(lambda ok: ok and self.cache_stats.collect(web_view, self.prefetcher))
+
+        web_view.urlChanged.connect(lambda qurl: self._on_url_changed(tab, qurl))
+        web_view.urlChanged.connect(self.record_history)
+        web_view.urlChanged.connect(lambda qurl: self.session.record("navigate", id=tab.tab_id, url=qurl.toString()))
+        web_view.titleChanged.connect(lambda title: self.record_title(web_view.url().toString(), title))
+        web_view.titleChanged.connect(lambda title: self.session.record("title", id=tab.tab_id, title=title))
+
+        # Custom context menu
+        web_view.installEventFilter(self)  # right-press timestamps for context_menu_latency
+        web_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        web_view.customContextMenuRequested.connect(
+            lambda pos, wv=web_view: self.show_custom_context_menu(pos, wv)
+        )
+        return web_view
+
+    def _on_load_started(self, tab):
+        tab.load_started = time.perf_counter()
+        tab.nav_timing = None  # read again once this load finishes
+
+    def _on_load_finished(self, tab, web_view, ok):
+        started = getattr(tab, "load_started", None)
+        if started is not None:
+            tab.load_ms = round((time.perf_counter() - started) * 1000, 1)
+            tab.load_started = None
+        if ok:
+            # Navigation Timing for task_report() and the task manager, one query per load
+            url = web_view.url()
+            web_view.page().runJavaScript(
+                NAVIGATION_TIMING_JS, lambda result: self._on_nav_timing(tab, web_view, url, result))
+
+    def _on_nav_timing(self, tab, web_view, url, result):
+        if self.web_view(tab, restore=False) is not web_view or web_view.url() != url:
+            return  # discarded or navigated away since; that load reports its own
+        tab.nav_timing = result
+
+    def _on_first_load(self, ok):
+        if not self._first_load_done:
+            self._first_load_done = True
+            self.first_page_loaded.emit()
+
+    # ------------------ Tab hibernation ------------------
+    def web_view(self, tab, restore=True):
         """
-        web_view.page().runJavaScript(js)
+        Returns the tab's QWebEngineView. A discarded tab is rebuilt first unless
+        restore is False, in which case None is returned for it.
+        """
+        if tab is None:
+            return None
+        web_view = tab.findChild(QWebEngineView)
+        if web_view is None and restore and self.is_discarded(tab):
+            # Whoever asks for the view wants it now, so this never waits in the load queue
+            self.loads.request(tab, lambda: self.restore_tab(tab), foreground=True)
+            web_view = tab.findChild(QWebEngineView)
+        return web_view
+
+    def is_discarded(self, tab):
+        """True for tabs without a live view: discarded ones and lazy ones not shown yet."""
+        return getattr(tab, "snapshot", None) is not None
+
+    def tab_url(self, tab):
+        """The tab's URL without waking a discarded tab."""
+        if self.is_discarded(tab):
+            return tab.snapshot.url
+        web_view = tab.findChild(QWebEngineView)
+        return web_view.url().toString() if web_view else ""
+
+    def tab_snapshot(self, tab):
+        """The tab's URL, title, history and scroll offset, taken without waking a discarded tab."""
+        if self.is_discarded(tab):
+            return tab.snapshot
+        web_view = tab.findChild(QWebEngineView)
+        return TabSnapshot.capture(web_view, self.tabs.tabText(self.tabs.indexOf(tab)))
+
+    def discard_tab(self, tab):
+        web_view = tab.findChild(QWebEngineView)
+        if web_view is None:
+            return
+        title = self.tabs.tabText(self.tabs.indexOf(tab))
+        tab.snapshot = TabSnapshot.capture(web_view, title)
+        self.loads.forget(tab)
+
+        tab.layout().removeWidget(web_view)
+        web_view.setParent(None)
+        web_view.deleteLater()  # takes the page and, once unshared, its renderer with it
+        self.show_placeholder(tab, title)
+
+    def show_placeholder(self, tab, text):
+        tab.placeholder = QLabel(text, tab)
+        tab.placeholder.setAlignment(Qt.AlignCenter)
+        tab.layout().addWidget(tab.placeholder)
+
+    def restore_tab(self, tab):
+        snapshot = tab.snapshot
+        if tab.placeholder is not None:
+            tab.layout().removeWidget(tab.placeholder)
+            tab.placeholder.deleteLater()
+            tab.placeholder = None
+        tab.snapshot = None
+        tab.last_active = time.monotonic()  # or the hibernator could discard it again straight away
+        web_view = self.create_web_view(tab)
+        snapshot.restore(web_view)
+        return web_view
+
+    # ------------------ Smooth scroll ------------------
+    def set_smooth_scroll(self, enabled):
+        install_smooth_scroll(browser_profile(), enabled)
+        settings().setValue("smooth_scroll", enabled)
+
+    # ------------------ Content blocking ------------------
+    def set_content_blocking(self, enabled):
+        self.adblock.enabled = enabled
+        settings().setValue("content_blocking", enabled)
 
     # ------------------ Custom context menu ------------------
     def show_custom_context_menu(self, pos, web_view):
         page = web_view.page()
         menu = page.createStandardContextMenu()  # preserve standard options
 
-        # Detect if a video element is under cursor
-        js_check_video = """
-        (function() {
-            var el = document.elementFromPoint(%d, %d);
-            while(el) {
-                if (el.tagName && el.tagName.toLowerCase() === 'video') return true;
-                el = el.parentElement;
-            }
-            return false;
-        })()
-        """ % (pos.x(), pos.y())
-
-        def add_pip_if_video(result):
-            if result:  # Only add PiP if cursor is on a video
-                pip_action = QAction("Picture in Picture", web_view)
-                pip_action.triggered.connect(lambda: self.activate_pip(web_view))
-                menu.insertAction(menu.actions()[0] if menu.actions() else None, pip_action)
-                menu.insertSeparator(menu.actions()[1] if len(menu.actions()) > 1 else None)
-            menu.exec_(web_view.mapToGlobal(pos))
-
-        page.runJavaScript(js_check_video, add_pip_if_video)
+        # The engine already hit-tested the click; no round trip to the renderer needed
+        data = page.contextMenuData()
+        if data.isValid() and data.mediaType() == QWebEngineContextMenuData.MediaTypeVideo:
+            media_url = data.mediaUrl().toString()
+            point = data.position()
+            pip_action = QAction("Picture in Picture", web_view)
+            pip_action.triggered.connect(lambda: self.activate_pip(web_view, media_url, point))
+            menu.insertAction(menu.actions()[0] if menu.actions() else None, pip_action)
+            menu.insertSeparator(menu.actions()[1] if len(menu.actions()) > 1 else None)
+
+        pressed_at = getattr(web_view, "_context_press_time", None)
+        web_view._context_press_time = None
+        if pressed_at is not None:
+            menu.aboutToShow.connect(
+                lambda: self.context_menu_latency.add((time.perf_counter() - pressed_at) * 1000))
+        menu.exec_(web_view.mapToGlobal(pos))
 
     # ------------------ Activate PiP ------------------
-    def activate_pip(self, web_view):
+    def activate_pip(self, web_view, media_url="", point=None):
+        """Toggles Picture in Picture for the video at media_url/point, else the page's first video."""
+        zoom = web_view.zoomFactor() or 1.0
+        x, y = (point.x() / zoom, point.y() / zoom) if point is not None else ("null", "null")
         js = """
-        var video = document.querySelector('video');
-        if (video) {
-            if (document.pictureInPictureElement) {
-                document.exitPictureInPicture();
-            } else {
-                video.requestPictureInPicture();
+        (function(src, x, y) {
+            var video = null;
+            if (src) {
+                video = Array.prototype.find.call(document.querySelectorAll('video'), function(v) {
+                    return v.currentSrc === src || v.src === src;
+                });
             }
-        }
-        """
+            if (!video && x !== null) {
+                var el = document.elementFromPoint(x, y);
+                while (el && el.tagName !== 'VIDEO') el = el.parentElement;
+                video = el;
+            }
+            video = video || document.querySelector('video');
+            if (video) {
+                if (document.pictureInPictureElement) {
+                    document.exitPictureInPicture();
+                } else {
+                    video.requestPictureInPicture();
+                }
+            }
+        })(%s, %s, %s);
+        """ % (json.dumps(media_url), x, y)
         web_view.page().runJavaScript(js)
 
     # ------------------ Event filter for URL bar ------------------
@@ -277,35 +658,59 @@ class Browser(QMainWindow):
                 if not getattr(obj, "_user_typing", False):
                     if obj.cursorPosition() == 0 or obj.selectedText() != obj.text():
                         QTimer.singleShot(0, obj.selectAll)
+        elif isinstance(obj, QWebEngineView):
+            # Input lands on the view's render widget child, which is created lazily
+            if event.type() == QEvent.ChildAdded and event.child().isWidgetType():
+                event.child().installEventFilter(self)
+        elif event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton:
+            web_view = obj.parent()
+            if isinstance(web_view, QWebEngineView):
+                web_view._context_press_time = time.perf_counter()
         return super().eventFilter(obj, event)
 
     # ------------------ Autocomplete ------------------
+    def seed_omnibox(self):
+        if not self._omnibox_seeded:
+            self._omnibox_seeded = True
+            self.omnibox_index.load(self.history.recent(OMNIBOX_SEED_LIMIT), self.bookmarks.urls())
+
     def fetch_online_suggestions(self, text, completer):
-        if not text.strip():
-            return
-        url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={text}"
-        request = QNetworkRequest(QUrl(url))
-        reply = self.network_manager.get(request)
-        reply.finished.connect(lambda r=reply, c=completer: self.handle_suggestions(r, c))
+        self.seed_omnibox()
+        # History and bookmark matches show up immediately; remote ones are appended when they arrive
+        local = self.omnibox_index.query(text)
+        completer.model().setStringList(local)
+        self.prefetcher.hint(*self.omnibox_index.top_match(text))
 
-    def handle_suggestions(self, reply, completer):
-        data = reply.readAll()
-        try:
-            suggestions = json.loads(str(data, 'utf-8'))[1]
-            completer.model().setStringList(suggestions)
-        except Exception as e:
-            print("Error parsing suggestions:", e)
+        def merge_remote(remote):
+            seen = set(local)
+            self.show_suggestions(completer, local + [s for s in remote if s not in seen])
+
+        self.suggestions.request(text, merge_remote)
+
+    def show_suggestions(self, completer, items):
+        completer.model().setStringList(items)
+        if items and completer.widget() is not None and completer.widget().hasFocus():
+            completer.complete()  # the popup may have been hidden while the list was empty
 
     # ------------------ Tab label helpers ------------------
     def update_tab_label(self, tab, title):
         index = self.tabs.indexOf(tab)
         if index != -1:
             self.tabs.tabBar().setTabText(index, title)
+            self.watcher.schedule_update()
 
     def set_tab_label(self, tab, label):
         self.update_tab_label(tab, label)
 
     # ------------------ Load URL ------------------
+    def load_typed_url(self):
+        tab = self.tabs.currentWidget()
+        if tab is None:
+            return
+        tab.nav.typed = None
+        self.url_bar._user_typing = False
+        self.load_url(self.web_view(tab), self.url_bar)
+
     def load_url(self, web_view, url_bar):
         query = url_bar.text().strip()
         if not query:
@@ -314,26 +719,270 @@ class Browser(QMainWindow):
             url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
         else:
             url = query if query.startswith("http") else "http://" + query
-        web_view.load(QUrl(url))
-        if url not in self.history:
-            self.history.append(url)
+        self.loads.request(web_view.parentWidget(), lambda: web_view.load(QUrl(url)), foreground=True)
+
+    # ------------------ Downloads ------------------
+    def download_manager(self):
+        if self._downloads is None:
+            self._downloads = DownloadManager(browser_profile(), self, data_path("downloads.json"))
+            self._downloads.added.connect(lambda _: self.show_downloads())
+        return self._downloads
+
+    def _resume_downloads(self):
+        if self._downloads is None and os.path.exists(data_path("downloads.json")):
+            self.download_manager()  # restarts the ones still running at exit
+
+    def show_downloads(self):
+        if self.downloads_window is None:
+            self.downloads_window = DownloadsWindow(self.download_manager(), self)
+        self.downloads_window.show()
+        self.downloads_window.raise_()
+
+    # ------------------ Metrics ------------------
+    def show_task_manager(self):
+        if self.task_manager is None:
+            self.task_manager = TaskManager(self)
+        self.task_manager.show()
+        self.task_manager.raise_()
+
+    def task_report(self):
+        """Machine-readable per-tab process and timing data (see taskmanager.tab_report)."""
+        return tab_report(self)
+
+    def renderer_report(self):
+        """Renderer processes with their RSS and the tabs each hosts (see taskmanager.renderer_report)."""
+        return renderer_report(self)
+
+    def load_stats(self):
+        """Load scheduler queue depth, running loads and queue wait times."""
+        return self.loads.stats()
+
+    def network_stats(self):
+        """HTTP cache hit rate, prefetch/preconnect counts and time saved by prefetching."""
+        return {**self.cache_stats.summary(), **self.prefetcher.stats}
+
+    def layout_passes_per_second(self):
+        """Plus-button layout passes in the last second; an idle window reports 0."""
+        return self.watcher.layout_passes.per_second()
+
+    # ------------------ History ------------------
+    def record_history(self, qurl):
+        if qurl.scheme() in ("http", "https", "file"):
+            self.history.record_visit(qurl.toString())
+
+    def record_title(self, url, title):
+        self.history.set_title(url, title)
+        self.omnibox_index.set_title(url, title)
+
+    # ------------------ Page text index ------------------
+    def page_text_index(self):
+        if self._page_text is None:
+            self._page_text = PageTextIndex(data_path("page_text.sqlite"))
+        return self._page_text
+
+    def set_page_text_indexing(self, enabled):
+        self._page_text_enabled = enabled
+        settings().setValue("page_text_indexing", enabled)
+
+    def schedule_page_text_capture(self, tab):
+        if not self._page_text_enabled:
+            return
+        # Owned by the tab so it dies with it; a new load restarts the wait
+        timer = getattr(tab, "page_text_timer", None)
+        if timer is None:
+            timer = tab.page_text_timer = QTimer(tab)
+            timer.setSingleShot(True)
+            timer.setInterval(PAGE_TEXT_DELAY)
+            timer.timeout.connect(lambda: self.capture_page_text(tab))
+        timer.start()
+
+    def capture_page_text(self, tab):
+        web_view = self.web_view(tab, restore=False)
+        if web_view is None:
+            return  # discarded in the meantime
+        url, title = web_view.url().toString(), web_view.title()
+        if url.startswith(("http://", "https://")):
+            # The text arrives asynchronously; normalizing and writing happen on the index's own thread
+            web_view.page().toPlainText(lambda text: self.page_text_index().add_page(url, title, text))
+
+    def search_page_history(self):
+        index = self.page_text_index()
+        SearchDialog(self, "Search Page History", "Words from a page you visited", lambda text: (
+            (f"{hit.title or hit.url}\n{hit.snippet}", hit.url, hit.title) for hit in index.search(text))).show()
+
+    # ------------------ Session ------------------
+    def restore_session(self):
+        """
+        Re-opens the tabs recorded by the last run. Every tab comes back as a lazy
+        placeholder and only the active one gets a web view, so a large session
+        costs little more to start than a single tab.
+        """
+        saved = list(self.session.tabs)
+        if not saved:
+            return False
+
+        self._restoring_session = True
+        try:
+            active_index = 0
+            for i, entry in enumerate(saved):
+                tab = self.add_tab(entry["url"], entry["title"] or entry["url"], background=True)
+                tab.tab_id = entry["id"]
+                if entry["id"] == self.session.active:
+                    active_index = i
+            self._next_tab_id = max(entry["id"] for entry in saved) + 1
+            self.tabs.setCurrentIndex(active_index)
+        finally:
+            self._restoring_session = False
+        return True
+
+    def open_initial_tabs(self):
+        """
+        Opens the restored session (or Home) as lazy tabs. Signals are blocked so
+        the first insert doesn't materialize a view; the current tab is only
+        loaded after the window's first paint.
+        """
+        was_blocked = self.tabs.blockSignals(True)
+        try:
+            if not self.restore_session():
+                self.add_tab(home_url(), "Home", background=True)
+        finally:
+            self.tabs.blockSignals(was_blocked)
+        self._journal_activate(self.tabs.currentIndex())
+        self.bind_nav_bar(self.tabs.currentIndex())
+        self.watcher.schedule_update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            self.first_paint.emit()
+            # Start the current tab on the next loop turn, after this frame is up
+            QTimer.singleShot(0, lambda: self.hibernator.on_current_changed(self.tabs.currentIndex()))
+
+    def _journal_activate(self, index):
+        tab = self.tabs.widget(index)
+        if tab is not None:
+            self.session.record("activate", id=tab.tab_id)
+
+    def _journal_move(self, from_index, to_index):
+        self.session.record("move", id=self.tabs.widget(to_index).tab_id, index=to_index)
 
     # ------------------ Close tab ------------------
     def close_tab(self, index):
         if index != -1 and self.tabs.count() > 1:
+            tab = self.tabs.widget(index)
+            if tab is self._nav_tab:
+                self._nav_tab = None  # nothing to stash for a tab that's going away
+            snapshot = self.tab_snapshot(tab)
+            snapshot.closed_id = self.session.new_closed_id()
+            if snapshot.url:
+                self.closed_tabs.push(snapshot)
             self.tabs.removeTab(index)
-            self.watcher.update_plus_button_position()
+            self.loads.forget(tab)
+            self.session.record("close", id=tab.tab_id, closed_id=snapshot.closed_id)
+            tab.deleteLater()  # removeTab() alone keeps the view and its renderer alive
+            self.watcher.schedule_update()
         else:
             self.close()
 
+    def reopen_closed_tab(self):
+        """Brings back the most recently closed tab with its history and scroll position."""
+        snapshot = self.closed_tabs.pop()
+        if snapshot is not None:
+            self.session.record("reopen", closed_id=snapshot.closed_id)
+            self.add_tab(label=snapshot.title, snapshot=snapshot)
+
+    def closeEvent(self, event):
+        self.history.close()  # drains queued visits to disk
+        self.bookmarks.close()
+        if self._downloads is not None:
+            self._downloads.close()
+        if self._page_text is not None:
+            self._page_text.close()
+        self.session.close()
+        super().closeEvent(event)
+
     # ------------------ Bookmarks ------------------
+    def populate_bookmarks_menu(self, menu):
+        # Each folder's menu is filled when it opens, and refilled only after bookmarks change
+        if menu.generation == self.bookmarks.generation:
+            return
+        # clear() drops the actions but not the submenus addMenu() parented to this menu
+        for action in menu.actions():
+            submenu = action.menu()
+            if submenu is not None and submenu.parent() is menu:
+                submenu.deleteLater()
+        menu.clear()
+        menu.generation = self.bookmarks.generation
+        if menu.folder_id == ROOT:
+            for text, slot in (("Add Bookmark", self.add_bookmark), ("Search Bookmarks…", self.search_bookmarks),
+                               ("Import Bookmarks…", self.import_bookmarks),
+                               ("Export Bookmarks…", self.export_bookmarks)):
+                action = QAction(text, menu)
+                action.triggered.connect(slot)
+                menu.addAction(action)
+            menu.addSeparator()
+
+        elif self.bookmarks.count(menu.folder_id):
+            open_all = QAction("Open All in Tabs", menu)
+            open_all.triggered.connect(lambda _, f=menu.folder_id: self.open_bookmark_folder(f))
+            menu.addAction(open_all)
+            menu.addSeparator()
+
+        for item in self.bookmarks.children(menu.folder_id, BOOKMARK_MENU_LIMIT):
+            if item.is_folder:
+                submenu = menu.addMenu(item.title or "(untitled folder)")
+                submenu.folder_id = item.id
+                submenu.generation = None
+                submenu.aboutToShow.connect(lambda m=submenu: self.populate_bookmarks_menu(m))
+            else:
+                menu.addAction(self._bookmark_action(item.title, item.url, menu))
+        if self.bookmarks.count(menu.folder_id) > BOOKMARK_MENU_LIMIT:
+            more = QAction("More… (search)", menu)
+            more.triggered.connect(self.search_bookmarks)
+            menu.addAction(more)
+
+    def _bookmark_action(self, text, url, parent):
+        action = QAction(text, parent)
+        action.triggered.connect(lambda _, u=url: self.open_bookmark(u, text))
+        return action
+
+    def open_bookmark_folder(self, folder_id):
+        # Background tabs, loaded a few at a time by the load scheduler
+        for item in self.bookmarks.children(folder_id):
+            if not item.is_folder:
+                self.add_tab(item.url, item.title, background=True, preload=True)
+
     def add_bookmark(self):
-        current_tab = self.tabs.currentWidget()
-        web_view = current_tab.findChild(QWebEngineView)
-        url = web_view.url().toString()
+        url = self.tab_url(self.tabs.currentWidget())
         text, ok = QInputDialog.getText(self, "Bookmark Name", "Enter bookmark name:")
         if ok and text:
-            self.bookmarks.append((text, url))
-            action = QAction(text, self)
-            action.triggered.connect(lambda _, u=url: self.add_tab(u, text))
-            self.bookmarks_menu.addAction(action)
+            self.bookmarks.add(url, text)
+            self.omnibox_index.add_bookmark(url, text)
+
+    def search_bookmarks(self):
+        SearchDialog(self, "Search Bookmarks", "Title, address or tag", lambda text: (
+            (f"{b.title}\n{b.url}", b.url, b.title) for b in self.bookmarks.search(text))).show()
+
+    def import_bookmarks(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Bookmarks", "", "Bookmarks (*.html *.htm)")
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            added = self.bookmarks.import_html(path)
+        finally:
+            QApplication.restoreOverrideCursor()
+        if self._omnibox_seeded:
+            self.omnibox_index.load((), self.bookmarks.urls())
+        QMessageBox.information(self, "Import Bookmarks", f"Imported {added:,} bookmarks.")
+
+    def export_bookmarks(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Bookmarks", "bookmarks.html", "Bookmarks (*.html)")
+        if path:
+            self.bookmarks.export_html(path)
+
+    def open_bookmark(self, url, label):
+        # Ctrl+click opens the bookmark in a lazy background tab
+        background = bool(QApplication.keyboardModifiers() & Qt.ControlModifier)
+        self.add_tab(url, label, background=background)
@@ -1,9 +1,23 @@
 # updater.py
-import json, os, sys, hashlib, tempfile
-from PyQt5.QtCore import QObject, QUrl, QCoreApplication, QStandardPaths, QFileInfo
+import json, os, sys, hashlib, tempfile, random
+from PyQt5.QtCore import (QObject, QUrl, QCoreApplication, QStandardPaths, QFileInfo,
+                          QTimer, pyqtSignal)
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
 from PyQt5.QtWidgets import QMessageBox, QProgressDialog
 from PyQt5.QtCore import QProcess
+from storage import data_path
+from downloads import Download, DownloadManager
+
+try:
+    import bsdiff4  # optional: enables delta updates
+except ImportError:
+    bsdiff4 = None
+
+HASH_CHUNK = 65536
+
+CHECK_INTERVAL = 6 * 60 * 60 * 1000    # ms between successful feed checks
+CHECK_JITTER = 0.1                      # ±10%, so a fleet doesn't hit the feed in lockstep
+CHECK_BACKOFF_BASE = 5 * 60 * 1000      # first retry after a failed check, doubled per failure
 
 def _ver_tuple(v):
     # simple 1.2.3 → (1,2,3) compare
@@ -13,32 +27,91 @@ class Updater(QObject):
     """
     Checks updates.json, downloads the new installer, verifies SHA256 (optional),
     launches it silently, then quits the app.
+
+    The feed may also list binary deltas keyed by the version they upgrade from:
+
+        "deltas": {"1.0.2": {"url": ".../1.0.2-to-1.0.3.bsdiff", "sha256": "..."}}
+
+    When one matches the running version, the patch is downloaded instead and
+    applied to the running executable; the result must match the feed's full
+    sha256. Any failure falls back to the full download. Patches are produced
+    with bsdiff4.file_diff(previous_exe, new_exe, patch_path).
     """
+    checkFinished = pyqtSignal(bool)  # False if the feed couldn't be fetched or parsed
+
     def __init__(self, parent, current_version, feed_url,
-                 installer_args=None, app_name="App"):
+                 installer_args=None, app_name="App", downloads=None):
         super().__init__(parent)
         self.current_version = current_version
         self.feed_url = feed_url
-        self.nam = QNetworkAccessManager(self)
+        self._nam = None
+        self._downloads = downloads
         self.installer_args = installer_args or [
             "/VERYSILENT", "/NORESTART", "/CLOSEAPPLICATIONS", "/RESTARTAPPLICATIONS"
         ]
         self.app_name = app_name
+        self.feed_cache_path = data_path("update_feed.json")
+        self.declined_version = None
+
+    @property
+    def nam(self):
+        if self._nam is None:
+            self._nam = QNetworkAccessManager(self)
+        return self._nam
+
+    @property
+    def downloads(self):
+        """The browser's DownloadManager when given one, else a private one with no profile."""
+        if self._downloads is None:
+            self._downloads = DownloadManager(parent=self)
+        return self._downloads
 
     def check(self, silent=True):
         req = QNetworkRequest(QUrl(self.feed_url))
+        req.setAttribute(QNetworkRequest.RedirectPolicyAttribute,
+                         QNetworkRequest.NoLessSafeRedirectPolicy)
+        cached = self._read_feed_cache()
+        # Conditional GET: an unchanged feed costs a 304 with no body
+        if cached.get("etag"):
+            req.setRawHeader(b"If-None-Match", cached["etag"].encode())
+        if cached.get("last_modified"):
+            req.setRawHeader(b"If-Modified-Since", cached["last_modified"].encode())
         reply = self.nam.get(req)
         reply.finished.connect(lambda r=reply, s=silent: self._on_feed(r, s))
 
+    def _read_feed_cache(self):
+        try:
+            with open(self.feed_cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_feed_cache(self, reply, body):
+        cache = {
+            "etag": bytes(reply.rawHeader(b"ETag")).decode("latin-1"),
+            "last_modified": bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1"),
+            "body": body,
+        }
+        try:
+            with open(self.feed_cache_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+
     def _on_feed(self, reply, silent):
         if reply.error():
             if not silent:
                 QMessageBox.warning(self.parent(), "Update",
                                     f"Failed to check for updates:\n{reply.errorString()}")
             reply.deleteLater()
+            self.checkFinished.emit(False)
             return
         try:
-            data = json.loads(bytes(reply.readAll()).decode("utf-8"))
+            if reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) == 304:
+                body = self._read_feed_cache()["body"]
+            else:
+                body = bytes(reply.readAll()).decode("utf-8")
+            data = json.loads(body)
             latest = data["version"].strip()
             url = data["url"].strip()
             sha256 = (data.get("sha256") or "").lower() or None
@@ -46,8 +119,20 @@ class Updater(QObject):
             if not silent:
                 QMessageBox.warning(self.parent(), "Update", f"Bad update feed.\n{e}")
             reply.deleteLater()
+            self.checkFinished.emit(False)
             return
+        if reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) != 304:
+            self._write_feed_cache(reply, body)
         reply.deleteLater()
+        self.checkFinished.emit(True)
+
+        # A malformed delta entry only costs the patch; the full installer is still usable
+        try:
+            delta = (data.get("deltas") or {}).get(self.current_version)
+            if delta is not None:
+                delta = {"url": delta["url"].strip(), "sha256": delta["sha256"].strip().lower()}
+        except Exception:
+            delta = None
 
         if _ver_tuple(latest) <= _ver_tuple(self.current_version):
             if not silent:
@@ -55,6 +140,10 @@ class Updater(QObject):
                                         f"You are up to date ({self.current_version}).")
             return
 
+        # Background checks don't nag about a version the user already turned down
+        if silent and latest == self.declined_version:
+            return
+
         # Ask user
         res = QMessageBox.question(
             self.parent(), f"{self.app_name} Update Available",
@@ -63,60 +152,130 @@ class Updater(QObject):
             QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
         )
         if res == QMessageBox.Yes:
-            self._download(url, sha256)
-
-    def _download(self, url, sha256):
-        req = QNetworkRequest(QUrl(url))
-        reply = self.nam.get(req)
+            self._download(url, sha256, delta)
+        else:
+            self.declined_version = latest
 
+    def _download(self, url, sha256, delta=None):
         downloads_dir = (QStandardPaths.writableLocation(QStandardPaths.DownloadLocation)
                          or tempfile.gettempdir())
         filename = QFileInfo(QUrl(url).path()).fileName() or "update.exe"
         self.dest_path = os.path.join(downloads_dir, filename)
 
-        self._file = open(self.dest_path, "wb")
+        # A delta needs a patch library, the exact executable it was built against,
+        # and a full-file hash to prove the patched result is right
+        if delta and sha256 and bsdiff4 is not None and getattr(sys, 'frozen', False):
+            self._start_download(delta["url"], self.dest_path + ".patch", "Downloading update patch...",
+                                 lambda ok, error: self._on_delta_finished(ok, error, delta, url, sha256))
+        else:
+            self._start_download(url, self.dest_path, "Downloading update...",
+                                 lambda ok, error: self._on_download_finished(ok, error, sha256))
 
-        self.dlg = QProgressDialog("Downloading update...", "Cancel", 0, 100, self.parent())
+    def _start_download(self, url, path, label, on_finished):
+        # Not listed in the Downloads window; an interrupted one still resumes from its .part file
+        self.download = self.downloads.fetch(url, path, persist=False, start=False)
+
+        self.dlg = QProgressDialog(label, "Cancel", 0, 100, self.parent())
         self.dlg.setWindowTitle(f"{self.app_name} Updater")
         self.dlg.setMinimumDuration(0)
         self.dlg.setAutoClose(False)
         self.dlg.setAutoReset(False)
-        self.dlg.canceled.connect(lambda: reply.abort())
+        self.dlg.canceled.connect(self.download.pause)  # keeps the partial for the next attempt
 
-        reply.downloadProgress.connect(self._on_progress)
-        reply.readyRead.connect(lambda: self._file.write(bytes(reply.readAll())))
-        reply.finished.connect(lambda: self._on_download_finished(reply, sha256))
+        self.download.progress.connect(self._on_progress)
+        self.download.finished.connect(on_finished)
+        self.download.start()
 
     def _on_progress(self, recvd, total):
         if total > 0:
             self.dlg.setValue(int(recvd * 100 / total))
 
-    def _on_download_finished(self, reply, sha256):
-        err = reply.error()
-        reply.deleteLater()
-        self._file.close()
+    def _on_download_finished(self, ok, error, sha256):
         self.dlg.close()
 
-        if err:
-            QMessageBox.warning(self.parent(), "Update",
-                                f"Download failed:\n{reply.errorString()}")
+        if not ok:
+            if error != Download.PAUSED:
+                QMessageBox.warning(self.parent(), "Update", f"Download failed:\n{error}")
+            return
+
+        # Hashed while the bytes arrived; no second pass over the installer
+        if sha256 and self.download.sha256() != sha256:
+            QMessageBox.critical(self.parent(), "Update", "Checksum mismatch. Aborting.")
             try: os.remove(self.dest_path)
             except: pass
             return
 
-        if sha256:
+        self._launch_installer()
+
+    def _on_delta_finished(self, ok, error, delta, url, sha256):
+        self.dlg.close()
+        if not ok and error == Download.PAUSED:
+            return
+
+        patch_path = self.dest_path + ".patch"
+        try:
+            if not ok:
+                raise RuntimeError(error)
+            if self.download.sha256() != delta["sha256"]:
+                raise RuntimeError("patch checksum mismatch")
+            bsdiff4.file_patch(sys.executable, self.dest_path, patch_path)
             h = hashlib.sha256()
             with open(self.dest_path, "rb") as f:
-                for chunk in iter(lambda: f.read(65536), b""):
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
                     h.update(chunk)
             if h.hexdigest().lower() != sha256:
-                QMessageBox.critical(self.parent(), "Update", "Checksum mismatch. Aborting.")
-                try: os.remove(self.dest_path)
-                except: pass
-                return
+                raise RuntimeError("patched installer checksum mismatch")
+        except Exception as e:
+            print("Delta update failed, falling back to full download:", e)
+            for path in (patch_path, self.dest_path):
+                try: os.remove(path)
+                except OSError: pass
+            self._start_download(url, self.dest_path, "Downloading update...",
+                                 lambda ok, error: self._on_download_finished(ok, error, sha256))
+            return
+
+        try: os.remove(patch_path)
+        except OSError: pass
+        self._launch_installer()
 
+    def _launch_installer(self):
         ok = QProcess.startDetached(self.dest_path, self.installer_args)
         if not ok:
             QMessageBox.critical(self.parent(), "Update", "Failed to launch installer.")
             return
         QCoreApplication.quit()
+
+
+class UpdateScheduler(QObject):
+    """
+    Runs Updater.check(silent=True) periodically: every CHECK_INTERVAL after a
+    success, with exponential backoff after failures, both jittered. Nothing is
+    scheduled until start(), so the first check can wait for the first page load.
+    """
+    def __init__(self, updater, interval=CHECK_INTERVAL, backoff_base=CHECK_BACKOFF_BASE):
+        super().__init__(updater)
+        self.updater = updater
+        self.interval = interval
+        self.backoff_base = backoff_base
+        self.failures = 0
+        self._started = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(lambda: self.updater.check(silent=True))
+        updater.checkFinished.connect(self._on_check_finished)
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self.updater.check(silent=True)
+
+    def _on_check_finished(self, ok):
+        if not self._started:
+            return  # a manual check before the scheduler took over
+        if ok:
+            self.failures = 0
+            delay = self.interval
+        else:
+            self.failures += 1
+            delay = min(self.backoff_base * 2 ** (self.failures - 1), self.interval)
+        self._timer.start(int(delay * random.uniform(1 - CHECK_JITTER, 1 + CHECK_JITTER)))
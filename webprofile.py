@@ -0,0 +1,219 @@
+# webprofile.py
+import html
+import time
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEnginePage
+from metrics import LatencyStats, RateCounter
+from storage import data_path, http_cache_max_mb, prefetch_enabled
+
+PROFILE_NAME = "cobalt"
+
+# --- Speculative loading ---
+PREFETCH_CONFIDENCE = 0.8     # omnibox confidence needed to fetch the top match's document
+PRECONNECT_CONFIDENCE = 0.5   # ... or just to open a connection to its origin
+PREFETCH_TTL = 300            # s; Chromium keeps prefetched documents usable for 5 minutes
+PRECONNECT_TTL = 60           # s; idle sockets don't live much longer than this
+PREFETCH_INTERVAL = 1000      # ms between speculative requests
+PREFETCH_TIMEOUT = 10000      # ms before a prefetch that hasn't reported back is abandoned
+MAX_PER_MINUTE = 10
+PREFETCH_BYTES_PER_MINUTE = 4 * 1024 * 1024  # beyond this, confident hints only preconnect
+
+# Reports cache use for the page's document and subresources. Entries with no
+# decoded body (opaque cross-origin responses) can't be judged and are skipped.
+CACHE_STATS_JS = """
+(function() {
+    var nav = performance.getEntriesByType('navigation')[0];
+    var entries = performance.getEntriesByType('resource').concat(nav ? [nav] : []);
+    var measured = 0, hits = 0;
+    entries.forEach(function(e) {
+        if (!e.decodedBodySize) return;
+        measured++;
+        if (e.transferSize === 0) hits++;
+    });
+    return {measured: measured, hits: hits,
+            document_cached: !!(nav && nav.decodedBodySize && nav.transferSize === 0)};
+})()
+"""
+
+_profile = None
+
+
+def browser_profile():
+    """
+    The named, persistent profile every tab shares: a size-capped disk HTTP cache
+    in <data dir>/cache, and cookies plus site storage kept apart in <data dir>/storage.
+    """
+    global _profile
+    if _profile is None:
+        _profile = QWebEngineProfile(PROFILE_NAME)
+        _profile.setCachePath(data_path("cache"))
+        _profile.setPersistentStoragePath(data_path("storage"))
+        _profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        _profile.setHttpCacheMaximumSize(http_cache_max_mb() * 1024 * 1024)
+        _profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+    return _profile
+
+
+def _origin(url):
+    return QUrl(url).adjusted(QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment).toString()
+
+
+class Prefetcher(QObject):
+    """
+    Warms the profile for where the user is probably going. A single hidden page
+    (created on first use) holds nothing but a <link rel=preconnect> or
+    <link rel=prefetch>, so Chromium opens the socket or fetches just the
+    document into the shared HTTP cache; nothing renders or runs. One request
+    at a time, spaced PREFETCH_INTERVAL apart and capped per minute, both in
+    requests and in bytes; a newer hint replaces a waiting one. A prefetch's
+    size (Resource Timing transferSize) is only known once it completes, so one
+    large document can overrun the byte budget, after which prefetches are cut
+    back to preconnects until the minute has passed.
+    """
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.enabled = prefetch_enabled()
+        self.stats = {"prefetches": 0, "preconnects": 0, "failed": 0, "rate_limited": 0,
+                      "byte_limited": 0, "prefetch_bytes": 0}
+        self.fetch_ms = {}        # url -> how long its prefetch took
+        self._page = None
+        self._busy = None         # (kind, url or origin) in flight
+        self._started = 0.0
+        self._pending = None
+        self._done_at = {}        # url or origin -> when it was warmed
+        self._rate = RateCounter(window=60.0)
+        self._fetched = deque()   # (when, bytes) of prefetches in the last minute
+
+        self._next = QTimer(self)
+        self._next.setSingleShot(True)
+        self._next.setInterval(PREFETCH_INTERVAL)
+        self._next.timeout.connect(self._start_pending)
+        self._timeout = QTimer(self)
+        self._timeout.setSingleShot(True)
+        self._timeout.setInterval(PREFETCH_TIMEOUT)
+        self._timeout.timeout.connect(lambda: self._finish(False))
+
+    def hint(self, url, confidence):
+        """Offers the omnibox's top match; acts only if confidence clears a threshold."""
+        if not self.enabled or not url or not url.startswith(("http://", "https://")):
+            return
+        if confidence >= PREFETCH_CONFIDENCE:
+            kind, key, ttl = "prefetch", url, PREFETCH_TTL
+        elif confidence >= PRECONNECT_CONFIDENCE:
+            kind, key, ttl = "preconnect", _origin(url), PRECONNECT_TTL
+        else:
+            return
+        if time.monotonic() - self._done_at.get(key, -ttl) < ttl or (kind, key) == self._busy:
+            return
+        self._pending = (kind, key)
+        if self._busy is None and not self._next.isActive():
+            self._start_pending()
+
+    def was_prefetched(self, url):
+        return time.monotonic() - self._done_at.get(url, -PREFETCH_TTL) < PREFETCH_TTL and url in self.fetch_ms
+
+    def _start_pending(self):
+        if self._pending is None or self._busy is not None:
+            return
+        if self._rate.per_second() * 60 >= MAX_PER_MINUTE:
+            self.stats["rate_limited"] += 1
+            self._next.start()
+            return
+        kind, key = self._pending
+        self._pending = None
+        if kind == "prefetch" and self._bytes_last_minute() >= PREFETCH_BYTES_PER_MINUTE:
+            self.stats["byte_limited"] += 1
+            kind, key = "preconnect", _origin(key)
+        self._busy = (kind, key)
+        self._rate.tick()
+        self._started = time.perf_counter()
+
+        if self._page is None:
+            self._page = QWebEnginePage(self.profile, self)
+            self._page.setAudioMuted(True)
+            self._page.titleChanged.connect(self._on_title)
+        escaped = html.escape(key, quote=True)
+        if kind == "prefetch":
+            markup = (f'<link rel="prefetch" href="{escaped}" as="document" '
+                      "onload=\"var e = performance.getEntriesByName(this.href)[0]; "
+                      "document.title = 'ok:' + (e ? e.transferSize : 0)\" "
+                      "onerror=\"document.title='failed'\">")
+        else:
+            markup = f'<link rel="preconnect" href="{escaped}">'
+            QTimer.singleShot(0, lambda: self._finish(True))  # nothing to wait for
+        self._page.setHtml(f"<!doctype html><title></title>{markup}", QUrl(_origin(key) + "/"))
+        self._timeout.start()
+
+    def _on_title(self, title):
+        if self._busy is None or self._busy[0] != "prefetch":
+            return
+        if title == "failed":
+            self._finish(False)
+        elif title.startswith("ok:"):
+            self._finish(True, int(title[3:] or 0))  # bytes over the wire, 0 if served from cache
+
+    def _bytes_last_minute(self):
+        cutoff = time.monotonic() - 60.0
+        while self._fetched and self._fetched[0][0] < cutoff:
+            self._fetched.popleft()
+        return sum(nbytes for _, nbytes in self._fetched)
+
+    def _finish(self, ok, nbytes=0):
+        if self._busy is None:
+            return
+        self._timeout.stop()
+        kind, key = self._busy
+        self._busy = None
+        if ok:
+            self._done_at[key] = time.monotonic()
+            if kind == "prefetch":
+                self.stats["prefetches"] += 1
+                self.stats["prefetch_bytes"] += nbytes
+                self._fetched.append((time.monotonic(), nbytes))
+                self.fetch_ms[key] = (time.perf_counter() - self._started) * 1000
+            else:
+                self.stats["preconnects"] += 1
+        else:
+            self.stats["failed"] += 1
+        self._next.start()
+
+
+class CacheStats:
+    """
+    HTTP cache hit rate across loaded pages (from Resource Timing transferSize),
+    and the time prefetching saved: for a navigation whose document came out of
+    the cache after a prefetch, the prefetch's own fetch time is time the user
+    didn't wait.
+    """
+    def __init__(self):
+        self.measured = 0
+        self.hits = 0
+        self.prefetched_navigations = 0
+        self.saved_ms = LatencyStats()
+
+    def collect(self, web_view, prefetcher=None):
+        url = web_view.url().toString()
+        web_view.page().runJavaScript(CACHE_STATS_JS, lambda result: self._add(result, url, prefetcher))
+
+    def _add(self, result, url, prefetcher):
+        if not isinstance(result, dict):
+            return
+        self.measured += int(result.get("measured") or 0)
+        self.hits += int(result.get("hits") or 0)
+        if prefetcher is not None and result.get("document_cached") and prefetcher.was_prefetched(url):
+            self.prefetched_navigations += 1
+            self.saved_ms.add(prefetcher.fetch_ms[url])
+
+    def hit_rate(self):
+        return self.hits / self.measured if self.measured else None
+
+    def summary(self):
+        return {
+            "cache_hit_rate": None if self.hit_rate() is None else round(self.hit_rate(), 3),
+            "cache_hits": self.hits,
+            "cache_measured": self.measured,
+            "prefetched_navigations": self.prefetched_navigations,
+            "time_saved_ms": self.saved_ms.summary(),
+        }